@@ -0,0 +1,117 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import json
+import logging
+from pathlib import Path
+
+from benchmarks import BenchmarkRunner
+
+
+# Configurations
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+
+
+class Benchmark:
+    def __init__(self):
+        self.args = self.parse_args()
+        self._parse_args()
+
+    def parse_args(self):
+        parser = argparse.ArgumentParser(description="TEFAS Data Exporter Benchmarks")
+        parser.add_argument(
+            "--stages", nargs="+", type=str, choices=BenchmarkRunner.STAGES,
+            help="Stages to benchmark. (default: all)"
+        )
+        parser.add_argument(
+            "--funds", nargs="+", type=int, default=BenchmarkRunner.FUND_COUNTS,
+            help=f"Fund counts to sweep. (default: {' '.join(map(str, BenchmarkRunner.FUND_COUNTS))})"
+        )
+        parser.add_argument(
+            "--years", nargs="+", type=int, default=BenchmarkRunner.HISTORY_YEARS,
+            help=f"Price history lengths in years to sweep, 1, 3 or 5. "
+                 f"(default: {' '.join(map(str, BenchmarkRunner.HISTORY_YEARS))})"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=3,
+            help="Timed runs per stage, the fastest one is reported. (default: 3)"
+        )
+        parser.add_argument(
+            "--max-workers", type=int, default=16,
+            help="Maximum number of workers of the crawl stage. (default: 16)"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Seed of the synthetic data. (default: 0)"
+        )
+        parser.add_argument(
+            "--output", type=str, default="benchmark.json",
+            help="Output JSON file of the results. (default: 'benchmark.json')"
+        )
+        parser.add_argument(
+            "--compare", type=str,
+            help="Results JSON file of an earlier run to compare the results against."
+        )
+        return parser.parse_args()
+
+    def run(self):
+        runner = BenchmarkRunner(
+            stages=self.args.stages,
+            fund_counts=self.args.funds,
+            history_years=self.args.years,
+            repeats=self.args.repeat,
+            crawl_workers=self.args.max_workers,
+            seed=self.args.seed,
+        )
+        report = runner.run()
+        BenchmarkRunner.write_report(report, Path(self.args.output))
+        logging.info(f"Benchmark results saved to {self.args.output}")
+
+        for result in report["results"]:
+            logging.info(
+                f"{result['stage']:<14} funds={result['funds']:<6} years={result['history_years']} "
+                f"{result['seconds']:.3f}s {result['items_per_second'] or 0:.1f} items/s "
+                f"peak {result['peak_memory_mb']:.1f} MB"
+            )
+
+        if self.args.compare:
+            with open(self.args.compare, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+            for comparison in BenchmarkRunner.compare_reports(baseline, report):
+                logging.info(
+                    f"{comparison['stage']:<14} funds={comparison['funds']:<6} years={comparison['history_years']} "
+                    f"{comparison['baseline_seconds']:.3f}s -> {comparison['seconds']:.3f}s "
+                    f"({comparison['speedup']}x), "
+                    f"peak {comparison['baseline_peak_memory_mb']:.1f} -> {comparison['peak_memory_mb']:.1f} MB"
+                )
+
+    def _parse_args(self):
+        if self.args.compare and not Path(self.args.compare).is_file():
+            raise ValueError("Results file to compare against does not exist.")
+
+
+if __name__ == '__main__':
+    Benchmark().run()
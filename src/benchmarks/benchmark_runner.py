@@ -0,0 +1,318 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import copy
+import gc
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from data_manager import AssetStorage, DataProcessor, FundDataManager, PriceUpdater
+from data_struct import Asset, Founder, FounderRegistry, PriceSeries
+from stand_in import StandInServer, SyntheticTEFAS
+from tefas_requests import ConcurrencyController, FounderFetcher, FundCodeFetcher, FundFetcher, RateLimiter, TEFASRequester
+from utils import DataFrameUtils
+
+
+class BenchmarkRunner:
+    STAGES = ["parse", "csv_load", "extend_prices", "merge_prices", "process", "crawl"]
+    FUND_COUNTS = [100, 500]
+    HISTORY_YEARS = [1, 5]
+    PERIODS = {
+        1: FundFetcher.FundRequester.YEAR_1,
+        3: FundFetcher.FundRequester.YEAR_3,
+        5: FundFetcher.FundRequester.YEAR_5,
+    }
+    # Fixed, so results of different days and commits run on the same data
+    TODAY = date(2025, 7, 15)
+    # Days of new prices merged by the price update stages, overlapping the existing ones
+    UPDATE_DAYS = 15
+    UPDATE_OVERLAP = 5
+
+
+    def __init__(
+        self,
+        stages: Optional[List[str]] = None,
+        fund_counts: Optional[List[int]] = None,
+        history_years: Optional[List[int]] = None,
+        repeats: int = 3,
+        crawl_workers: int = 16,
+        seed: int = 0,
+    ):
+        self.stages = stages or self.STAGES
+        self.fund_counts = fund_counts or self.FUND_COUNTS
+        self.history_years = history_years or self.HISTORY_YEARS
+        self.repeats = repeats
+        self.crawl_workers = crawl_workers
+        self.seed = seed
+        self._check_validity()
+
+        self.results: List[dict] = []
+
+    def run(self) -> dict:
+        for history_years in self.history_years:
+            synthetic = SyntheticTEFAS(
+                fund_count=max(self.fund_counts),
+                history_years=history_years,
+                today=self.TODAY,
+                seed=self.seed,
+            )
+            period = self.PERIODS[history_years]
+
+            for fund_count in self.fund_counts:
+                codes = synthetic.get_fund_codes()[:fund_count]
+                pages = [synthetic.get_fund_page(code, period.value) for code in codes]
+                assets = [
+                    FundFetcher.parse_fund_data(code, self._get_founder(synthetic, code), page)
+                    for code, page in zip(codes, pages)
+                ]
+
+                with tempfile.TemporaryDirectory() as directory:
+                    csv_path = Path(directory) / "fund_data_raw.csv"
+                    AssetStorage.write_csv(assets, csv_path)
+
+                    stages = {
+                        "parse": lambda: self._benchmark_parse(synthetic, codes, pages),
+                        "csv_load": lambda: self._benchmark_csv_load(csv_path),
+                        "extend_prices": lambda: self._benchmark_extend_prices(assets),
+                        "merge_prices": lambda: self._benchmark_merge_prices(assets),
+                        "process": lambda: self._benchmark_process(assets),
+                        "crawl": lambda: self._benchmark_crawl(synthetic, fund_count, period),
+                    }
+                    for stage in self.stages:
+                        self.results.append({
+                            "stage": stage,
+                            "funds": fund_count,
+                            "history_years": history_years,
+                            **stages[stage](),
+                        })
+
+        return self.get_report()
+
+    def get_report(self) -> dict:
+        return {
+            "metadata": BenchmarkRunner.get_metadata(),
+            "settings": {
+                "repeats": self.repeats,
+                "crawl_workers": self.crawl_workers,
+                "seed": self.seed,
+            },
+            "results": self.results,
+        }
+
+    @staticmethod
+    def get_metadata() -> dict:
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=Path(__file__).parent, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        }
+
+    @staticmethod
+    def write_report(report: dict, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    @staticmethod
+    def compare_reports(baseline: dict, report: dict) -> List[dict]:
+        # Speedup of every stage and size present in both reports, above 1 is faster
+        key = lambda result: (result["stage"], result["funds"], result["history_years"])
+        baseline_results = {key(result): result for result in baseline["results"]}
+
+        comparison = []
+        for result in report["results"]:
+            baseline_result = baseline_results.get(key(result), None)
+            if baseline_result is None:
+                continue
+            comparison.append({
+                "stage": result["stage"],
+                "funds": result["funds"],
+                "history_years": result["history_years"],
+                "baseline_seconds": baseline_result["seconds"],
+                "seconds": result["seconds"],
+                "speedup": round(baseline_result["seconds"] / result["seconds"], 3) if result["seconds"] else None,
+                "baseline_peak_memory_mb": baseline_result["peak_memory_mb"],
+                "peak_memory_mb": result["peak_memory_mb"],
+            })
+        return comparison
+
+    def _benchmark_parse(self, synthetic: SyntheticTEFAS, codes: List[str], pages: List[str]) -> dict:
+        founders = [self._get_founder(synthetic, code) for code in codes]
+        return self._measure(
+            lambda: [FundFetcher.parse_fund_data(code, founder, page) for code, founder, page in zip(codes, founders, pages)],
+            items=len(pages),
+            size=sum(len(page.encode("utf-8")) for page in pages),
+        )
+
+    def _benchmark_csv_load(self, csv_path: Path) -> dict:
+        return self._measure(
+            lambda: Asset.from_csv(csv_path),
+            items=None,
+            size=csv_path.stat().st_size,
+            count_items=len,
+        )
+
+    def _benchmark_extend_prices(self, assets: List[Asset]) -> dict:
+        def extend(copies: List[Tuple[Asset, PriceSeries]]) -> None:
+            for asset, new in copies:
+                asset.extend_prices(new)
+
+        return self._measure(extend, items=len(assets), setup=self._get_price_update_setup(assets))
+
+    def _benchmark_merge_prices(self, assets: List[Asset]) -> dict:
+        def merge(copies: List[Tuple[Asset, PriceSeries]]) -> None:
+            price_updater = PriceUpdater([asset for asset, _ in copies])
+            price_updater.merge_prices({asset.get_code(): new for asset, new in copies})
+
+        return self._measure(merge, items=len(assets), setup=self._get_price_update_setup(assets))
+
+    def _get_price_update_setup(self, assets: List[Asset]) -> Callable[[], List[Tuple[Asset, PriceSeries]]]:
+        # Every asset loses its last days, which are then merged back in
+        updates = []
+        for asset in assets:
+            prices = asset.get_prices()
+            cut = max(len(prices) - self.UPDATE_DAYS + self.UPDATE_OVERLAP, 1)
+            updates.append((prices[:cut], prices[max(cut - self.UPDATE_OVERLAP, 0):]))
+
+        def setup() -> List[Tuple[Asset, PriceSeries]]:
+            copies = []
+            for asset, (existing, new) in zip(assets, updates):
+                asset_copy = copy.copy(asset)
+                asset_copy.set_prices(existing)
+                copies.append((asset_copy, new))
+            return copies
+
+        return setup
+
+    def _benchmark_process(self, assets: List[Asset]) -> dict:
+        return self._measure(
+            lambda: DataFrameUtils.postprocess_dataframe(DataProcessor(assets).process()),
+            items=len(assets),
+        )
+
+    def _benchmark_crawl(self, synthetic: SyntheticTEFAS, fund_count: int, period: "FundFetcher.FundRequester") -> dict:
+        # The crawl measures the fetching code, not the throttling of the process:
+        # requests are not rate limited, concurrency is fixed and every run
+        # starts without cached responses.
+        base_url = TEFASRequester.BASE_URL
+        rate_limiter = TEFASRequester.rate_limiter
+        concurrency_controller = TEFASRequester.concurrency_controller
+        response_cache = TEFASRequester.response_cache
+        with StandInServer(port=0, synthetic=synthetic) as server:
+            TEFASRequester.set_base_url(server.get_base_url())
+            TEFASRequester.set_pool_size(self.crawl_workers)
+            TEFASRequester.set_rate_limiter(RateLimiter())
+            TEFASRequester.set_response_cache(None)
+            try:
+                FounderRegistry.get_default().refresh(FounderFetcher.fetch_founders())
+                fund_codes_data = {
+                    code: founder
+                    for code, founder in FundCodeFetcher.fetch_tefas_fund_codes().items()
+                    if code in set(synthetic.get_fund_codes()[:fund_count])
+                }
+
+                def crawl() -> List[Asset]:
+                    TEFASRequester.set_concurrency_controller(ConcurrencyController(max_limit=self.crawl_workers))
+                    manager = FundDataManager(fund_price_range=period.name, max_workers=self.crawl_workers)
+                    return manager.fetch_fund_data(fund_codes_data)
+
+                result = self._measure(crawl, items=None, count_items=len)
+                result["requests"] = server.get_stats()["requests"]
+                return result
+            finally:
+                TEFASRequester.set_base_url(base_url)
+                TEFASRequester.set_rate_limiter(rate_limiter)
+                TEFASRequester.set_concurrency_controller(concurrency_controller)
+                TEFASRequester.set_response_cache(response_cache)
+
+    def _measure(
+        self,
+        function: Callable,
+        items: Optional[int] = None,
+        size: Optional[int] = None,
+        setup: Optional[Callable] = None,
+        count_items: Optional[Callable] = None,
+    ) -> dict:
+        # Timed without tracemalloc, which slows allocations down,
+        # the peak memory comes from one extra traced run.
+        timings = []
+        for _ in range(self.repeats):
+            args = (setup(),) if setup else ()
+            gc.collect()
+            started_at = time.perf_counter()
+            result = function(*args)
+            timings.append(time.perf_counter() - started_at)
+
+        if count_items is not None:
+            items = count_items(result)
+
+        args = (setup(),) if setup else ()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        seconds = min(timings)
+        measurement = {
+            "seconds": round(seconds, 6),
+            "mean_seconds": round(sum(timings) / len(timings), 6),
+            "items": items,
+            "items_per_second": round(items / seconds, 2) if items and seconds else None,
+            "peak_memory_mb": round(peak / (1024 * 1024), 3),
+        }
+        if size is not None:
+            measurement["mb_per_second"] = round(size / (1024 * 1024) / seconds, 3) if seconds else None
+        return measurement
+
+    @staticmethod
+    def _get_founder(synthetic: SyntheticTEFAS, code: str) -> Founder:
+        founder_code, founder_name = synthetic.fund_founders[code]
+        return FounderRegistry.get_default().get_or_create(founder_code, founder_name)
+
+    def _check_validity(self) -> bool:
+        unknown_stages = set(self.stages) - set(self.STAGES)
+        if unknown_stages:
+            raise ValueError(f"'{sorted(unknown_stages)[0]}' is not a valid benchmark stage.")
+        if not self.fund_counts or any(count <= 0 for count in self.fund_counts):
+            raise ValueError("Fund counts must be positive integers.")
+        if any(years not in self.PERIODS for years in self.history_years):
+            raise ValueError(f"History lengths must be one of {sorted(self.PERIODS)} years.")
+        if self.repeats <= 0:
+            raise ValueError("Number of repeats must be a positive integer.")
+        if self.crawl_workers <= 0:
+            raise ValueError("Number of crawl workers must be a positive integer.")
+        return True
@@ -17,8 +17,13 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+from .asset_storage import AssetStorage
+from .asset_writer import AssetWriter
+from .background_writer import BackgroundWriter
+from .checkpoint_journal import CheckpointJournal
 from .data_processor import DataProcessor
 from .fund_data_manager import FundDataManager
+from .price_panel import PricePanel
 from .price_updater import PriceUpdater
 
-__all__ = ["DataProcessor", "FundDataManager", "PriceUpdater"]
+__all__ = ["AssetStorage", "AssetWriter", "BackgroundWriter", "CheckpointJournal", "DataProcessor", "FundDataManager", "PricePanel", "PriceUpdater"]
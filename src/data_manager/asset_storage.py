@@ -0,0 +1,218 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from data_struct import Asset, PriceSeries
+from utils import DataFrameUtils
+
+
+class AssetStorage:
+    FUNDS_FILENAME = "funds.parquet"
+    PRICES_FILENAME = "prices.parquet"
+    DISTRIBUTIONS_FILENAME = "distributions.parquet"
+    JSONL_SUFFIX = ".jsonl"
+
+    FUNDS_SCHEMA = pa.schema([
+        ("code", pa.string()),
+        ("name", pa.string()),
+        ("founder_code", pa.string()),
+        ("founder_name", pa.string()),
+        ("category", pa.string()),
+        ("risk_score", pa.int64()),
+        ("market_share", pa.float64()),
+        ("is_in_tefas", pa.bool_()),
+    ])
+    PRICES_SCHEMA = pa.schema([
+        ("code", pa.dictionary(pa.int32(), pa.string())),
+        ("date", pa.date32()),
+        ("value", pa.float64()),
+    ])
+    DISTRIBUTIONS_SCHEMA = pa.schema([
+        ("code", pa.dictionary(pa.int32(), pa.string())),
+        ("name", pa.string()),
+        ("amount", pa.float64()),
+    ])
+
+
+    @staticmethod
+    def read_assets(path: Path, workers: int = 0) -> List[Asset]:
+        if Path(path).is_dir():
+            return AssetStorage.read_parquet(path)
+        if Path(path).suffix == AssetStorage.JSONL_SUFFIX:
+            return AssetStorage.read_jsonl(path)
+        return Asset.from_csv(path, workers=workers)
+
+    @staticmethod
+    def write_assets(assets: List[Asset], path: Path, storage_format: "AssetStorage.StorageFormat") -> None:
+        if storage_format == AssetStorage.StorageFormat.PARQUET:
+            AssetStorage.write_parquet(assets, path)
+        elif storage_format == AssetStorage.StorageFormat.JSONL:
+            AssetStorage.write_jsonl(assets, path)
+        else:
+            AssetStorage.write_csv(assets, path)
+
+    @staticmethod
+    def write_csv(assets: List[Asset], csv_path: Path) -> None:
+        raw_df = AssetStorage.create_dataframe(assets)
+        raw_df.to_csv(csv_path, index=False, encoding="utf-8")
+
+    @staticmethod
+    def create_dataframe(assets: List[Asset]) -> pd.DataFrame:
+        raw_df = pd.DataFrame([obj.to_dict() for obj in assets])
+        return DataFrameUtils.postprocess_dataframe(raw_df)
+
+    @staticmethod
+    def write_jsonl(assets: List[Asset], jsonl_path: Path) -> None:
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            f.writelines(AssetStorage.to_json_line(asset) for asset in assets)
+
+    @staticmethod
+    def read_jsonl(jsonl_path: Path) -> List[Asset]:
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            return [Asset.from_dict(json.loads(line)) for line in f if line.strip()]
+
+    @staticmethod
+    def to_json_line(asset: Asset) -> str:
+        return json.dumps(asset.to_dict(), ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def write_parquet(assets: List[Asset], directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        funds, prices, distributions = AssetStorage.create_parquet_tables(assets)
+        pq.write_table(funds, directory / AssetStorage.FUNDS_FILENAME)
+        pq.write_table(prices, directory / AssetStorage.PRICES_FILENAME)
+        pq.write_table(distributions, directory / AssetStorage.DISTRIBUTIONS_FILENAME)
+
+    @staticmethod
+    def create_parquet_tables(assets: List[Asset]) -> Tuple[pa.Table, pa.Table, pa.Table]:
+        funds = pa.Table.from_pylist(
+            [AssetStorage._get_fund_row(asset) for asset in assets],
+            schema=AssetStorage.FUNDS_SCHEMA,
+        )
+
+        # Long format prices: one row per fund and date
+        codes = [asset.get_code() for asset in assets]
+        series = [asset.get_prices() for asset in assets]
+        price_codes = np.repeat(np.arange(len(series), dtype=np.int32), [len(s) for s in series])
+        prices = pa.table({
+            "code": pa.DictionaryArray.from_arrays(price_codes, codes),
+            "date": pa.array(AssetStorage._concatenate([s.get_dates() for s in series], PriceSeries.DATE_DTYPE), pa.date32()),
+            "value": AssetStorage._concatenate([s.get_values() for s in series], PriceSeries.VALUE_DTYPE),
+        }, schema=AssetStorage.PRICES_SCHEMA)
+
+        distributions = [asset.get_asset_distributions() for asset in assets]
+        distribution_codes = np.repeat(np.arange(len(distributions), dtype=np.int32), [len(d) for d in distributions])
+        distributions = pa.table({
+            "code": pa.DictionaryArray.from_arrays(distribution_codes, codes),
+            "name": [dist.get_distribution_name() for dists in distributions for dist in dists],
+            "amount": [dist.get_distribution_amount() for dists in distributions for dist in dists],
+        }, schema=AssetStorage.DISTRIBUTIONS_SCHEMA)
+
+        return funds, prices, distributions
+
+    @staticmethod
+    def read_parquet(directory: Path) -> List[Asset]:
+        directory = Path(directory)
+        funds = pq.read_table(directory / AssetStorage.FUNDS_FILENAME, schema=AssetStorage.FUNDS_SCHEMA)
+        prices = pq.read_table(directory / AssetStorage.PRICES_FILENAME, read_dictionary=["code"])
+        distributions = pq.read_table(directory / AssetStorage.DISTRIBUTIONS_FILENAME)
+
+        price_series = AssetStorage._split_prices(prices)
+
+        distribution_dicts: Dict[str, List[dict]] = {}
+        for row in distributions.to_pylist():
+            distribution_dicts.setdefault(row["code"], []).append({"name": row["name"], "amount": row["amount"]})
+
+        return [
+            Asset.from_dict({
+                **row,
+                "prices": price_series.get(row["code"], None),
+                "asset_distributions": distribution_dicts.get(row["code"], None),
+            })
+            for row in funds.to_pylist()
+        ]
+
+    @staticmethod
+    def _split_prices(prices: pa.Table) -> Dict[str, PriceSeries]:
+        if prices.num_rows == 0:
+            return {}
+
+        code_column = prices.column("code").combine_chunks()
+        codes = code_column.dictionary.to_pylist()
+        indices = code_column.indices.to_numpy()
+        dates = prices.column("date").to_numpy()
+        values = prices.column("value").to_numpy()
+
+        # Rows are written grouped by fund and sorted by date;
+        # anything else gets sorted once here.
+        boundaries = np.flatnonzero(np.diff(indices)) + 1
+        if len(boundaries) + 1 != len(np.unique(indices)):
+            order = np.lexsort((dates, indices))
+            indices, dates, values = indices[order], dates[order], values[order]
+            boundaries = np.flatnonzero(np.diff(indices)) + 1
+
+        starts = np.concatenate([[0], boundaries])
+        stops = np.concatenate([boundaries, [len(indices)]])
+
+        return {
+            codes[indices[start]]: PriceSeries(dates=dates[start:stop], values=values[start:stop])
+            for start, stop in zip(starts.tolist(), stops.tolist())
+        }
+
+    @staticmethod
+    def _get_fund_row(asset: Asset) -> dict:
+        return {
+            "code": asset.get_code(),
+            "name": asset.get_name(),
+            "founder_code": asset.get_founder().get_code(),
+            "founder_name": asset.get_founder().get_name(),
+            "category": asset.get_category(),
+            "risk_score": asset.get_risk_score(),
+            "market_share": asset.get_market_share(),
+            "is_in_tefas": asset.is_in_tefas(),
+        }
+
+    @staticmethod
+    def _concatenate(arrays: List[np.ndarray], dtype) -> np.ndarray:
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+
+    class StorageFormat(Enum):
+        CSV = "csv"
+        JSONL = "jsonl"
+        PARQUET = "parquet"
+
+        @staticmethod
+        def get_storage_format(value: Optional[str] = None) -> "AssetStorage.StorageFormat":
+            if value is None:
+                return AssetStorage.StorageFormat.CSV
+            try:
+                return AssetStorage.StorageFormat[value.upper()]
+            except KeyError:
+                raise ValueError(f"'{value}' is not a valid storage format.")
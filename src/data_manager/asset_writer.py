@@ -0,0 +1,135 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import List, Optional
+
+from data_struct import Asset
+from .asset_storage import AssetStorage
+from .background_writer import BackgroundWriter
+
+
+class AssetWriter:
+    BATCH_SIZE = 64
+
+
+    def __init__(
+        self,
+        path: Path,
+        storage_format: Optional[AssetStorage.StorageFormat] = None,
+        batch_size: Optional[int] = None,
+    ):
+        self.path = Path(path)
+        self.storage_format = storage_format or AssetStorage.StorageFormat.CSV
+        self.batch_size = batch_size or AssetWriter.BATCH_SIZE
+        self._check_validity()
+
+        self.writer = BackgroundWriter(f"assets to {self.path}", self._write_assets, max_items=self.batch_size)
+        self.pending: List[Asset] = []
+        self.count = 0
+
+        self.file = None
+        self.header_written = False
+        self.parquet_writers: List[pq.ParquetWriter] = []
+
+    def __enter__(self) -> "AssetWriter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def start(self) -> None:
+        self._open()
+        self.writer.start()
+
+    def write(self, asset: Asset) -> None:
+        self.writer.put(asset)
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        finally:
+            self._close()
+
+    def get_count(self) -> int:
+        return self.count
+
+    def _write_assets(self, assets: List[Asset], finished: bool) -> None:
+        # Written once the batch is full or the queue runs dry, so a crash
+        # loses only the assets still in the queue. Parquet files are only
+        # readable once closed, so they always get full row groups instead.
+        if self.storage_format != AssetStorage.StorageFormat.PARQUET:
+            if assets:
+                self._write_batch(assets)
+            return
+
+        self.pending.extend(assets)
+        while len(self.pending) >= self.batch_size or (finished and self.pending):
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            self._write_batch(batch)
+
+    def _open(self) -> None:
+        if self.storage_format == AssetStorage.StorageFormat.PARQUET:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.parquet_writers = [
+                pq.ParquetWriter(self.path / filename, schema)
+                for filename, schema in (
+                    (AssetStorage.FUNDS_FILENAME, AssetStorage.FUNDS_SCHEMA),
+                    (AssetStorage.PRICES_FILENAME, AssetStorage.PRICES_SCHEMA),
+                    (AssetStorage.DISTRIBUTIONS_FILENAME, AssetStorage.DISTRIBUTIONS_SCHEMA),
+                )
+            ]
+        else:
+            self.file = open(self.path, "w", encoding="utf-8", newline="")
+
+    def _write_batch(self, batch: List[Asset]) -> None:
+        if self.storage_format == AssetStorage.StorageFormat.PARQUET:
+            # Every batch becomes a row group of each table
+            for writer, table in zip(self.parquet_writers, AssetStorage.create_parquet_tables(batch)):
+                writer.write_table(table)
+        elif self.storage_format == AssetStorage.StorageFormat.JSONL:
+            self.file.writelines(AssetStorage.to_json_line(asset) for asset in batch)
+            self.file.flush()
+        else:
+            raw_df = AssetStorage.create_dataframe(batch)
+            raw_df.to_csv(self.file, index=False, header=not self.header_written)
+            self.header_written = True
+            self.file.flush()
+        self.count += len(batch)
+
+    def _close(self) -> None:
+        for writer in self.parquet_writers:
+            writer.close()
+        self.parquet_writers = []
+
+        if self.file is not None:
+            if not self.header_written and self.writer.error is None:
+                # Same as writing an empty list of assets at once
+                AssetStorage.create_dataframe([]).to_csv(self.file, index=False)
+            self.file.close()
+            self.file = None
+
+    def _check_validity(self) -> bool:
+        if not isinstance(self.batch_size, int):
+            raise ValueError("Batch size must be an integer.")
+        if self.batch_size <= 0:
+            raise ValueError("Batch size must be a positive integer.")
+        return True
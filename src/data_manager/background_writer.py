@@ -0,0 +1,91 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import queue
+import threading
+from typing import Any, Callable, List, Optional
+
+
+class BackgroundWriter:
+    QUEUE_SIZE = 256
+
+
+    def __init__(
+        self,
+        description: str,
+        write_items: Callable[[List[Any], bool], None],
+        max_items: Optional[int] = None,
+        queue_size: Optional[int] = None,
+    ):
+        # write_items gets what was queued meanwhile, at most max_items at once,
+        # and whether the writer is closing. It runs on the thread of the writer.
+        self.description = description
+        self.write_items = write_items
+        self.max_items = max_items
+        self.queue_size = queue_size or BackgroundWriter.QUEUE_SIZE
+        self._check_validity()
+
+        # Bounded, so producers wait for the writer instead of piling up items
+        self.queue: "queue.Queue[Optional[Any]]" = queue.Queue(maxsize=self.queue_size)
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self._run, name=self.description, daemon=True)
+        self.thread.start()
+
+    def put(self, item: Any) -> None:
+        self.raise_error()
+        self.queue.put(item)
+
+    def close(self) -> None:
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        self.raise_error()
+
+    def raise_error(self) -> None:
+        if self.error is not None:
+            raise RuntimeError(f"Error writing {self.description}: {self.error}") from self.error
+
+    def _run(self) -> None:
+        finished = False
+        try:
+            while not finished:
+                items = [self.queue.get()]
+                while items[-1] is not None and (self.max_items is None or len(items) < self.max_items):
+                    try:
+                        items.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                finished = items[-1] is None
+                self.write_items(items[:-1] if finished else items, finished)
+        except BaseException as e:
+            self.error = e
+            # Keeps draining, so that producers blocked on a full queue are released
+            while not finished:
+                finished = self.queue.get() is None
+
+    def _check_validity(self) -> bool:
+        if self.max_items is not None and (not isinstance(self.max_items, int) or self.max_items <= 0):
+            raise ValueError("Maximum number of items must be a positive integer.")
+        if not isinstance(self.queue_size, int) or self.queue_size <= 0:
+            raise ValueError("Queue size must be a positive integer.")
+        return True
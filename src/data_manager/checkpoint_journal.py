@@ -0,0 +1,158 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from data_struct import Asset
+from .background_writer import BackgroundWriter
+
+
+class CheckpointJournal:
+    RUN = "run"
+    ASSET = "asset"
+    FAILURE = "failure"
+    # Option holding the day of the run, journals of another day are not resumed
+    DATE = "date"
+
+
+    def __init__(self, path: Path, options: Optional[dict] = None, resume: bool = False):
+        self.path = Path(path)
+        self.options = options or {}
+        self.resume = resume
+
+        self.assets: Dict[str, Asset] = {}
+        self.failures: Dict[str, str] = {}
+
+        if resume:
+            self._load()
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if not resume:
+            self._write_records([{"type": CheckpointJournal.RUN, "options": self.options}])
+
+        # Records are written and synced by a thread of their own,
+        # so neither the fetching threads nor the event loop wait for the disk.
+        self.writer = BackgroundWriter(f"checkpoint journal {self.path}", self._write_queued_records)
+        self.writer.start()
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_assets(self) -> List[Asset]:
+        return list(self.assets.values())
+
+    def get_failures(self) -> Dict[str, str]:
+        # Funds that failed and were not completed by a later attempt
+        return {code: error for code, error in self.failures.items() if code not in self.assets}
+
+    def record_asset(self, asset: Asset) -> None:
+        # Serialized by the journal thread
+        self._append({"type": CheckpointJournal.ASSET, "asset": asset})
+
+    def record_failure(self, code: str, error: BaseException) -> None:
+        self._append({
+            "type": CheckpointJournal.FAILURE,
+            "code": code,
+            "error": f"{type(error).__name__}: {error}",
+        })
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        finally:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def remove(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def _append(self, record: dict) -> None:
+        self.writer.put(record)
+
+    def _write_queued_records(self, records: List[dict], finished: bool) -> None:
+        # Everything queued meanwhile is synced at once
+        self._write_records(records)
+
+    def _write_records(self, records: List[dict]) -> None:
+        if not records:
+            return
+
+        self.file.writelines(json.dumps(self._encode(record), ensure_ascii=False) + "\n" for record in records)
+        self.file.flush()
+        # Funds only count as done once durable, a crash loses at most
+        # the records still queued, which are fetched again on resume.
+        os.fsync(self.file.fileno())
+
+    @staticmethod
+    def _encode(record: dict) -> dict:
+        if record["type"] == CheckpointJournal.ASSET:
+            return {**record, "asset": record["asset"].to_dict()}
+        return record
+
+    def _load(self) -> None:
+        if not self.path.is_file():
+            raise ValueError(f"Checkpoint journal {self.path} does not exist, nothing to resume.")
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        for i, line in enumerate(lines):
+            # Records end with their newline, only the last one can be cut off
+            # by a crash in the middle of a write.
+            if not line.endswith("\n"):
+                logging.warning(f"Ignoring the incomplete last record of checkpoint journal {self.path}")
+                self._truncate(sum(len(line.encode("utf-8")) for line in lines[:i]))
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                raise ValueError(f"Checkpoint journal {self.path} is corrupt at line {i + 1}.")
+
+            record_type = record.get("type", None)
+            if record_type == CheckpointJournal.RUN:
+                run_date = record.get("options", {}).get(CheckpointJournal.DATE, None)
+                if run_date != self.options.get(CheckpointJournal.DATE, None):
+                    raise ValueError(
+                        f"Checkpoint journal {self.path} was written on {run_date}, "
+                        f"its funds are out of date on {self.options.get(CheckpointJournal.DATE, None)}. "
+                        f"Run again without --resume."
+                    )
+                if record.get("options", {}) != self.options:
+                    raise ValueError(
+                        f"Checkpoint journal {self.path} was written with different options "
+                        f"{record.get('options', {})}, cannot resume with {self.options}."
+                    )
+            elif record_type == CheckpointJournal.ASSET:
+                asset = Asset.from_dict(record["asset"])
+                self.assets[asset.get_code()] = asset
+            elif record_type == CheckpointJournal.FAILURE:
+                self.failures[record["code"]] = record["error"]
+
+    def _truncate(self, size: int) -> None:
+        # Appended records would otherwise follow the broken line
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
@@ -18,8 +18,9 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
 import pandas as pd
-from typing import List
+from typing import List, Optional
 
+from .price_panel import PricePanel
 from data_struct import Asset, TimeFrame
 
 
@@ -44,8 +45,24 @@ class DataProcessor:
     ]
 
 
-    def __init__(self, assets: List[Asset]):
+    def __init__(self, assets: List[Asset], price_change_columns: Optional[List[dict]] = None):
         self.assets = assets
+        self.price_change_columns = price_change_columns or self.PRICE_CHANGE_COLUMNS
+
+    @staticmethod
+    def parse_price_change_column(value: str) -> dict:
+        # "<time_frame>_<amount>", the same form as the output column names
+        time_frame_name, _, amount = value.rpartition("_")
+        try:
+            time_frame = TimeFrame[time_frame_name.upper()]
+            amount = int(amount)
+        except (KeyError, ValueError):
+            raise ValueError(f"'{value}' is not a valid price change column.")
+
+        if amount <= 0:
+            raise ValueError(f"'{value}' is not a valid price change column.")
+
+        return {"time_frame": time_frame, "amount": amount}
 
     def process(self) -> pd.DataFrame:
         price_df = self._parse_price_change_ratios()
@@ -60,28 +77,8 @@ class DataProcessor:
         return df
 
     def _parse_price_change_ratios(self):
-        price_change_ratios = []
-
-        for asset in self.assets:
-            asset_price_change = {}
-
-            for change in self.PRICE_CHANGE_COLUMNS:
-                time_frame = change["time_frame"]
-                amount = change["amount"]
-
-                asset_start_date = asset.get_date_range().get_start_date()
-                asset_end_date = asset.get_date_range().get_end_date()
-                date_range = TimeFrame.get_date_range(time_frame, amount, asset_end_date)
-
-                if asset_start_date > date_range.get_start_date():
-                    continue
-
-                price_change = asset.get_price_change_ratio(date_range)
-                asset_price_change[f"{time_frame.name.lower()}_{amount}"] = price_change
-
-            price_change_ratios.append(asset_price_change)
-
-        return pd.DataFrame(price_change_ratios)
+        panel = PricePanel.from_assets(self.assets)
+        return panel.get_price_change_ratios(self.price_change_columns)
 
     def _parse_asset_distribution(self):
         asset_distributions_list = []
@@ -17,28 +17,64 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+import asyncio
+import logging
+import multiprocessing
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from datetime import date
+from enum import Enum
+from functools import partial
 from tqdm import tqdm
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set
 
-from data_struct import Asset, Founder
-from tefas_requests import FundFetcher, FundCodeFetcher
+from .asset_writer import AssetWriter
+from .checkpoint_journal import CheckpointJournal
+from .price_updater import PriceUpdater
+from data_struct import Asset, DateRange, Founder, FounderRegistry, PriceSeries
+from tefas_requests import AsyncTEFASRequester, FundFetcher, FundCodeFetcher, TEFASRequester, UpdatedPricesFetcher
+from utils import DateUtils, Profiler
 
 
 class FundDataManager:
+    # Timeout of the fund pages in the retry pass, relative to the first one
+    RETRY_TIMEOUT_FACTOR = 3
+    # Days after which the page of every fund has been reloaded once in delta mode
+    DELTA_REFRESH_DAYS = 7
+    # Parse jobs in flight per parse worker, the rest of the downloads wait for a slot
+    PARSE_QUEUE_FACTOR = 2
+
+
     def __init__(
         self,
         fund_price_range: Optional[str] = None,
         additional_founders: Optional[List[str]] = None,
         max_workers: int = 16,
+        retry_workers: Optional[int] = None,
+        engine: Optional[str] = None,
+        parse_workers: int = 0,
+        asset_writer: Optional[AssetWriter] = None,
+        keep_assets: bool = True,
+        checkpoint_journal: Optional[CheckpointJournal] = None,
     ):
         self.fund_price_range = fund_price_range
         self.additional_founders = additional_founders
         self.max_workers = max_workers
+        self.retry_workers = max(1, max_workers // 4) if retry_workers is None else retry_workers
+        self.engine = FundDataManager.FetchEngine.get_fetch_engine(engine)
+        self.parse_workers = parse_workers
+        self.asset_writer = asset_writer
+        self.keep_assets = keep_assets
+        self.checkpoint_journal = checkpoint_journal
+        self._check_validity()
 
         self.lock = threading.Lock()
         self.data: List[Dict] = []
+        self.backfill_prices: Optional[Dict[str, PriceSeries]] = None
+        self.missing_codes: List[str] = []
+        self.failures: Dict[str, Dict[str, str]] = {}
 
     def get_fund_codes_data(self) -> Dict[str, Founder]:
         fund_codes_data = FundCodeFetcher.fetch_tefas_fund_codes()
@@ -53,28 +89,402 @@ class FundDataManager:
 
         return fund_codes_data
 
+    def get_failures(self) -> Dict[str, Dict[str, str]]:
+        return dict(self.failures)
+
+    def get_failure_report(self) -> dict:
+        # Permanent failures grouped by the class of their last error
+        errors: Dict[str, List[dict]] = {}
+        for code, failure in sorted(self.failures.items()):
+            errors.setdefault(failure["error_class"], []).append({"code": code, "message": failure["message"]})
+
+        return {
+            "failed": len(self.failures),
+            "errors": {
+                error_class: {"count": len(failures), "funds": failures}
+                for error_class, failures in sorted(errors.items(), key=lambda item: -len(item[1]))
+            },
+        }
+
     def fetch_fund_data(self, fund_codes_data: Dict[str, Founder]) -> List[Asset]:
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+        if self.checkpoint_journal is not None:
+            fund_codes_data = self._resume_fund_data(fund_codes_data)
+
+        self._fetch_fund_data_pass(fund_codes_data, self.max_workers, FundFetcher.TIMEOUT, "Fetching funds")
+
+        # Failed funds are mostly the throttled tail of the run,
+        # they get a second chance with fewer workers and more patience.
+        if self.failures and self.retry_workers:
+            retry_codes_data = {code: fund_codes_data[code] for code in self.failures}
+            timeout = FundFetcher.TIMEOUT * FundDataManager.RETRY_TIMEOUT_FACTOR
+            logging.info(
+                f"Retrying {len(retry_codes_data)} failed funds "
+                f"with {self.retry_workers} workers and a {timeout}s timeout"
+            )
+            self.failures = {}
+            self._fetch_fund_data_pass(retry_codes_data, self.retry_workers, timeout, "Retrying funds")
+
+        return self.data
+
+    def delta_fund_data(
+        self,
+        fund_codes_data: Dict[str, Founder],
+        baseline_assets: List[Asset],
+        window_days: Optional[int] = None,
+        refresh_days: Optional[int] = None,
+    ) -> List[Asset]:
+        # Funds of the baseline only get the new prices from the bulk history
+        # endpoint, fund pages are fetched for new and stale funds only.
+        # The result approximates a full fetch: details only shown on the pages,
+        # e.g. market shares, are up to refresh_days old for the other funds.
+        refresh_days = refresh_days or FundDataManager.DELTA_REFRESH_DAYS
+        baseline = Asset.get_code_asset_dict(baseline_assets)
+        kept_assets = [baseline[code] for code in fund_codes_data if code in baseline]
+        new_codes = [code for code in fund_codes_data if code not in baseline]
+        removed_codes = [code for code in baseline if code not in fund_codes_data]
+
+        updated_codes = set()
+        if kept_assets:
+            price_updater = PriceUpdater(kept_assets, window_days=window_days)
+            price_updater.update_prices()
+            updated_codes = price_updater.get_updated_codes()
+
+        today = DateUtils.get_today()
+        stale_codes = [
+            asset.get_code() for asset in kept_assets
+            if self._is_stale(asset, fund_codes_data[asset.get_code()], updated_codes, today, refresh_days)
+        ]
+        logging.info(
+            f"Delta against the baseline: {len(new_codes)} new, {len(removed_codes)} removed, "
+            f"{len(stale_codes)} stale and {len(kept_assets) - len(stale_codes)} funds "
+            f"keeping the details of the baseline"
+        )
+
+        # The other funds keep their details, with the price history a fund page would show today
+        start_date = FundFetcher.FundRequester.get_fund_requester_type(self.fund_price_range).get_start_date(today)
+        date_range = DateRange(start_date=start_date, end_date=today)
+        stale_code_set = set(stale_codes)
+        for asset in kept_assets:
+            if asset.get_code() not in stale_code_set:
+                asset.set_prices(asset.get_prices(date_range))
+                self._add_asset(asset)
+
+        return self.fetch_fund_data({
+            code: fund_codes_data[code]
+            for code in new_codes + stale_codes
+        })
+
+    @staticmethod
+    def _is_stale(
+        asset: Asset,
+        founder: Optional[Founder],
+        updated_codes: Set[str],
+        today: date,
+        refresh_days: int,
+    ) -> bool:
+        # Details of a fund are only visible on its page, so every fund page is
+        # also refreshed on a rotating day, once in every refresh_days.
+        if zlib.crc32(asset.get_code().encode("utf-8")) % refresh_days == today.toordinal() % refresh_days:
+            return True
+        # Funds that moved to another founder or had no prices in the history
+        # endpoint, e.g. ones that stopped trading, get their page reloaded.
+        # A founder missing from the registry is left to the page fetch to report.
+        if founder is None or asset.get_founder() is None:
+            return True
+        if asset.get_founder().get_code() != founder.get_code() or asset.get_code() not in updated_codes:
+            return True
+        # And so do funds of the baseline with incomplete details
+        return asset.get_name() is None or len(asset.get_prices()) == 0
+
+    def _fetch_fund_data_pass(
+        self,
+        fund_codes_data: Dict[str, Founder],
+        max_workers: int,
+        timeout: float,
+        description: str,
+    ) -> None:
+        if self.engine == FundDataManager.FetchEngine.ASYNC:
+            asyncio.run(self._fetch_fund_data_async(fund_codes_data, max_workers, timeout, description))
+        else:
+            self._fetch_fund_data_threaded(fund_codes_data, max_workers, timeout, description)
+
+    def backfill_fund_data(
+        self,
+        fund_codes_data: Dict[str, Founder],
+        date_range: DateRange,
+        window_days: Optional[int] = None,
+    ) -> List[Asset]:
+        # Prices come from the bulk history endpoint in date windows,
+        # fund pages are fetched once per fund for the metadata and distribution.
+        logging.info(
+            f"Backfilling prices for funds "
+            f"from {DateUtils.format_date(date_range.get_start_date())} "
+            f"to {DateUtils.format_date(date_range.get_end_date())}"
+        )
+        self.backfill_prices = UpdatedPricesFetcher.fetch_updated_prices(
+            date_range, window_days=window_days, max_workers=self.max_workers,
+        )
+        self.missing_codes = []
+
+        # The prices are set as every asset is added, before it is written
+        try:
+            assets = self.fetch_fund_data(fund_codes_data)
+        finally:
+            self.backfill_prices = None
+
+        # Funds without a price history are not written with the shorter
+        # prices of their pages, they are reported as failed instead.
+        if self.missing_codes:
+            logging.warning(
+                f"No price history found for {len(self.missing_codes)} funds, "
+                f"marking them as failed: {', '.join(sorted(self.missing_codes))}"
+            )
+            for code in self.missing_codes:
+                self._add_failure(code, ValueError("No price history found in the backfill date range."))
+
+        return assets
+
+    def _fetch_fund_data_threaded(
+        self,
+        fund_codes_data: Dict[str, Founder],
+        max_workers: int,
+        timeout: float,
+        description: str,
+    ) -> List[Asset]:
+        # Downloads are faster than parsing, so the pages waiting for the
+        # process pool are bounded instead of piling up in its queue.
+        parse_slots = None
+        if self.parse_workers:
+            parse_slots = threading.BoundedSemaphore(self.parse_workers * FundDataManager.PARSE_QUEUE_FACTOR)
+
+        with tqdm(total=len(fund_codes_data), desc=description, unit="fund") as progress, \
+                self._create_parse_executor() as parse_executor, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {
                 executor.submit(
                     self._fetch_fund_data,
-                    fund_code, founder, self.fund_price_range,
+                    fund_code, founder, self.fund_price_range, parse_executor, timeout, parse_slots,
                 ): fund_code
                 for fund_code, founder in fund_codes_data.items()
             }
 
-            for future in tqdm(as_completed(futures), total=len(futures), desc="Fetching funds", unit="fund"):
+            for future in as_completed(futures):
                 code = futures[future]
                 try:
-                    future.result()
+                    parse_future = future.result()
                 except Exception as e:
                     tqdm.write(f"Error fetching fund {code}: {e}")
+                    self._add_failure(code, e)
+                    self._update_progress(progress)
+                    continue
+
+                if parse_future is None:
+                    self._update_progress(progress)
+                else:
+                    parse_future.add_done_callback(partial(self._on_fund_parsed, code, progress))
 
         return self.data
 
-    def _fetch_fund_data(self, code: str, founder: Founder, fund_price_range: Optional[str] = None) -> None:
-        analyzer = FundFetcher(code, founder, fund_price_range)
-        asset = analyzer.get_fund_data()
+    def _fetch_fund_data(
+        self,
+        code: str,
+        founder: Founder,
+        fund_price_range: Optional[str] = None,
+        parse_executor: Optional[ProcessPoolExecutor] = None,
+        timeout: Optional[float] = None,
+        parse_slots: Optional[threading.BoundedSemaphore] = None,
+    ) -> Optional[Future]:
+        profiler = Profiler.get_default()
+        with profiler.timer("page_fetch"):
+            html = FundFetcher.fetch_html(code, fund_price_range, timeout=timeout)
 
+        if parse_executor is None:
+            self._add_asset(self._parse_fund_data(code, founder, html))
+            return None
+
+        # Only the download happens in this thread, parsing is CPU-bound
+        # and is handed over to the process pool.
+        if parse_slots is None:
+            return parse_executor.submit(FundFetcher.parse_fund_data, code, founder, html)
+
+        parse_slots.acquire()
+        try:
+            parse_future = parse_executor.submit(FundFetcher.parse_fund_data, code, founder, html)
+        except BaseException:
+            parse_slots.release()
+            raise
+        parse_future.add_done_callback(lambda _: parse_slots.release())
+        return parse_future
+
+    def _on_fund_parsed(self, code: str, progress: tqdm, future: Future) -> None:
+        try:
+            self._add_asset(self._intern_founder(future.result()))
+        except Exception as e:
+            tqdm.write(f"Error parsing fund {code}: {e}")
+            self._add_failure(code, e)
+        finally:
+            self._update_progress(progress)
+
+    async def _fetch_fund_data_async(
+        self,
+        fund_codes_data: Dict[str, Founder],
+        max_workers: int,
+        timeout: float,
+        description: str,
+    ) -> List[Asset]:
+        # Like in the threaded fetch, the pages downloaded for the process pool
+        # are bounded: a slot is held from the download until the parse returns.
+        parse_slots = None
+        if self.parse_workers:
+            parse_slots = asyncio.Semaphore(self.parse_workers * FundDataManager.PARSE_QUEUE_FACTOR)
+
+        with tqdm(total=len(fund_codes_data), desc=description, unit="fund") as progress, \
+                self._create_parse_executor() as parse_executor:
+            async with AsyncTEFASRequester(max_concurrency=max_workers) as requester:
+                await asyncio.gather(*(
+                    self._fetch_fund_data_coroutine(
+                        requester, fund_code, founder, self.fund_price_range, parse_executor, progress, timeout,
+                        parse_slots,
+                    )
+                    for fund_code, founder in fund_codes_data.items()
+                ))
+
+        return self.data
+
+    async def _fetch_fund_data_coroutine(
+        self,
+        requester: AsyncTEFASRequester,
+        code: str,
+        founder: Founder,
+        fund_price_range: Optional[str],
+        parse_executor: Optional[ProcessPoolExecutor],
+        progress: tqdm,
+        timeout: Optional[float] = None,
+        parse_slots: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            async with parse_slots if parse_slots is not None else nullcontext():
+                html = await FundFetcher.fetch_html_async(requester, code, fund_price_range, timeout=timeout)
+
+                # Parsing never runs on the event loop, it would stall every other request.
+                # Without a process pool it goes to the default thread pool of the loop.
+                if parse_executor is None:
+                    asset = await loop.run_in_executor(None, self._parse_fund_data, code, founder, html)
+                else:
+                    asset = self._intern_founder(await loop.run_in_executor(
+                        parse_executor, FundFetcher.parse_fund_data, code, founder, html,
+                    ))
+
+            # The writer and the journal block on their full queues,
+            # which has to happen off the event loop as well.
+            await loop.run_in_executor(None, self._add_asset, asset)
+        except Exception as e:
+            tqdm.write(f"Error fetching fund {code}: {e}")
+            await loop.run_in_executor(None, self._add_failure, code, e)
+        finally:
+            self._update_progress(progress)
+
+    @staticmethod
+    def _parse_fund_data(code: str, founder: Founder, html: str) -> Asset:
+        with Profiler.get_default().timer("parse"):
+            return FundFetcher.parse_fund_data(code, founder, html)
+
+    @staticmethod
+    def _intern_founder(asset: Asset) -> Asset:
+        # Assets parsed in another process come back with their own copy of the founder
+        asset.set_founder(FounderRegistry.get_default().intern(asset.get_founder()))
+        return asset
+
+    @staticmethod
+    def _update_progress(progress: tqdm) -> None:
+        progress.set_postfix(TEFASRequester.get_progress_postfix(), refresh=False)
+        progress.update(1)
+
+    def _resume_fund_data(self, fund_codes_data: Dict[str, Founder]) -> Dict[str, Founder]:
+        # Funds completed by an earlier run come from the journal,
+        # only the rest, including the ones that failed, are fetched.
+        resumed_assets = [
+            asset for asset in self.checkpoint_journal.get_assets()
+            if asset.get_code() in fund_codes_data
+        ]
+        for asset in resumed_assets:
+            self._store_asset(asset)
+
+        resumed_codes = {asset.get_code() for asset in resumed_assets}
+        if resumed_codes:
+            logging.info(
+                f"Resumed {len(resumed_codes)} funds from the checkpoint journal, "
+                f"fetching the remaining {len(fund_codes_data) - len(resumed_codes)} "
+                f"({len(self.checkpoint_journal.get_failures())} failed before)"
+            )
+
+        return {code: founder for code, founder in fund_codes_data.items() if code not in resumed_codes}
+
+    def _add_asset(self, asset: Asset) -> None:
+        if self.backfill_prices is not None:
+            prices = self.backfill_prices.get(asset.get_code(), None)
+            if not prices:
+                with self.lock:
+                    self.missing_codes.append(asset.get_code())
+                return
+            asset.set_prices(prices)
+
+        if self.checkpoint_journal is not None:
+            self.checkpoint_journal.record_asset(asset)
+        self._store_asset(asset)
+
+    def _add_failure(self, code: str, error: Exception) -> None:
         with self.lock:
-            self.data.append(asset)
+            self.failures[code] = {"error_class": type(error).__name__, "message": str(error)}
+        if self.checkpoint_journal is not None:
+            self.checkpoint_journal.record_failure(code, error)
+
+    def _store_asset(self, asset: Asset) -> None:
+        # Streamed assets are written as soon as they are finished,
+        # and only kept if needed later, e.g. for the processed data.
+        if self.asset_writer is not None:
+            self.asset_writer.write(asset)
+        if self.keep_assets:
+            with self.lock:
+                self.data.append(asset)
+
+    def _create_parse_executor(self):
+        if not self.parse_workers:
+            return nullcontext()
+
+        # Spawned workers avoid forking a process that is already running
+        # the download threads.
+        return ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _check_validity(self) -> bool:
+        if not isinstance(self.max_workers, int):
+            raise ValueError("Maximum number of workers must be an integer.")
+        if self.max_workers <= 0:
+            raise ValueError("Maximum number of workers must be a positive integer.")
+        if not isinstance(self.retry_workers, int):
+            raise ValueError("Number of retry workers must be an integer.")
+        if self.retry_workers < 0:
+            raise ValueError("Number of retry workers cannot be negative.")
+        if not isinstance(self.parse_workers, int):
+            raise ValueError("Number of parse workers must be an integer.")
+        if self.parse_workers < 0:
+            raise ValueError("Number of parse workers cannot be negative.")
+        return True
+
+
+    class FetchEngine(Enum):
+        THREAD = "thread"
+        ASYNC = "async"
+
+        @staticmethod
+        def get_fetch_engine(value: Optional[str] = None) -> "FundDataManager.FetchEngine":
+            if value is None:
+                return FundDataManager.FetchEngine.THREAD
+            try:
+                return FundDataManager.FetchEngine[value.upper()]
+            except KeyError:
+                raise ValueError(f"'{value}' is not a valid fetch engine.")
@@ -0,0 +1,123 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+from data_struct import Asset, DateRange, PriceSeries, TimeFrame, TradingCalendar
+
+
+class PricePanel:
+    def __init__(self, codes: List[str], dates: np.ndarray, values: np.ndarray):
+        self.codes = codes
+        self.dates = dates
+        self.values = values
+        self._check_validity()
+
+        # Row of the first and last price of every fund
+        valid = ~np.isnan(self.values)
+        self.first_rows = np.argmax(valid, axis=0)
+        self.last_rows = len(self.dates) - 1 - np.argmax(valid[::-1], axis=0)
+
+        # For every (row, fund), the row of the next available price of that fund,
+        # or len(dates) if there is none
+        rows = np.arange(len(self.dates), dtype=np.int64)[:, None]
+        next_rows = np.where(valid, rows, len(self.dates))
+        self.next_rows = np.minimum.accumulate(next_rows[::-1], axis=0)[::-1]
+
+    def get_codes(self) -> List[str]:
+        return self.codes
+
+    def get_dates(self) -> np.ndarray:
+        return self.dates
+
+    def get_values(self) -> np.ndarray:
+        return self.values
+
+    def get_price_change_ratios(self, price_change_columns: List[dict]) -> pd.DataFrame:
+        fund_count = len(self.codes)
+        if not fund_count or not price_change_columns:
+            return pd.DataFrame(index=range(fund_count))
+
+        columns = [
+            f"{change['time_frame'].name.lower()}_{change['amount']}"
+            for change in price_change_columns
+        ]
+
+        # Window start dates only depend on the end date, which is shared by most funds
+        end_dates, end_date_indices = np.unique(self.dates[self.last_rows], return_inverse=True)
+        start_dates = np.array([
+            [
+                TimeFrame.get_date_range(change["time_frame"], change["amount"], end_date).get_start_date()
+                for end_date in end_dates.tolist()
+            ]
+            for change in price_change_columns
+        ], dtype=PriceSeries.DATE_DTYPE)[:, end_date_indices]
+
+        # Same rule as the per-asset path: skip windows starting before the fund's history
+        included = self.dates[self.first_rows][None, :] <= start_dates
+
+        funds = np.arange(fund_count)
+        start_rows = np.searchsorted(self.dates, start_dates, side="left")
+        start_rows = self.next_rows[np.minimum(start_rows, len(self.dates) - 1), funds[None, :]]
+        included &= start_rows <= self.last_rows[None, :]
+
+        start_values = self.values[np.where(included, start_rows, 0), funds[None, :]]
+        end_values = self.values[self.last_rows, funds]
+
+        ratios = np.where(included, end_values[None, :] / start_values - 1, np.nan)
+        ratios = np.round(ratios, 4)
+
+        df = pd.DataFrame(ratios.T, columns=columns)
+        return df.loc[:, included.any(axis=1)]
+
+    @classmethod
+    def from_assets(cls, assets: List[Asset], calendar: Optional[TradingCalendar] = None) -> "PricePanel":
+        series = [asset.get_prices() for asset in assets]
+        if not series:
+            return cls(codes=[], dates=np.empty(0, dtype=PriceSeries.DATE_DTYPE), values=np.empty((0, 0)))
+
+        all_dates = np.concatenate([s.get_dates() for s in series])
+        all_values = np.concatenate([s.get_values() for s in series])
+        funds = np.repeat(np.arange(len(series)), [len(s) for s in series])
+
+        # Rows are the trading days of the covered period, plus any
+        # other day a price was actually published on.
+        dates = np.unique(all_dates)
+        calendar = calendar or TradingCalendar.get_default()
+        trading_dates = calendar.get_trading_dates(DateRange(start_date=dates[0].item(), end_date=dates[-1].item()))
+        dates = np.union1d(dates, trading_dates)
+        values = np.full((len(dates), len(series)), np.nan)
+        values[np.searchsorted(dates, all_dates), funds] = all_values
+
+        return cls(
+            codes=[asset.get_code() for asset in assets],
+            dates=dates,
+            values=values,
+        )
+
+    def _check_validity(self) -> bool:
+        if self.values.ndim != 2:
+            raise ValueError("Panel values must be two-dimensional.")
+        if self.values.shape != (len(self.dates), len(self.codes)):
+            raise ValueError("Panel values must have one row per date and one column per fund.")
+        if len(self.codes) and np.any(np.all(np.isnan(self.values), axis=0)):
+            raise ValueError("Every fund in the panel must have at least one price.")
+        return True
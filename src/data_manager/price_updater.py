@@ -19,16 +19,21 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
 from dateutil.relativedelta import relativedelta
-from typing import List
+from typing import Dict, List, Optional, Set
 
-from data_struct import Asset, DateRange
+from data_struct import Asset, DateRange, PriceSeries
 from tefas_requests import UpdatedPricesFetcher
 from utils import DateUtils
 
 
 class PriceUpdater:
-    def __init__(self, assets: List[Asset]):
+    def __init__(self, assets: List[Asset], window_days: Optional[int] = None):
         self.code_asset_dict = Asset.get_code_asset_dict(assets)
+        self.window_days = window_days
+        self.updated_codes: Set[str] = set()
+
+    def get_updated_codes(self) -> Set[str]:
+        return set(self.updated_codes)
 
     def get_last_date(self):
         return max(
@@ -55,10 +60,22 @@ class PriceUpdater:
             f"to {DateUtils.format_date(date_range.get_end_date())}"
         )
 
-        new_asset_prices = UpdatedPricesFetcher.fetch_updated_prices(date_range)
-        for fund_code, prices in new_asset_prices.items():
-            asset = self.code_asset_dict.get(fund_code, None)
-            if asset is not None:
-                asset.extend_prices(prices)
+        new_asset_prices = UpdatedPricesFetcher.fetch_updated_prices(date_range, window_days=self.window_days)
+        self.merge_prices(new_asset_prices)
 
         return list(self.code_asset_dict.values())
+
+    def merge_prices(self, new_asset_prices: Dict[str, PriceSeries]) -> None:
+        # All funds are merged in one pass instead of one extend per fund
+        assets = [
+            asset for code, asset in self.code_asset_dict.items()
+            if new_asset_prices.get(code, None)
+        ]
+        merged_prices = PriceSeries.upsert_all(
+            [asset.get_prices() for asset in assets],
+            [new_asset_prices[asset.get_code()] for asset in assets],
+        )
+
+        for asset, prices in zip(assets, merged_prices):
+            asset.set_prices(prices)
+            self.updated_codes.add(asset.get_code())
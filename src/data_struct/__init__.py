@@ -21,7 +21,10 @@ from .asset_distribution import AssetDistribution
 from .asset import Asset
 from .date_range import DateRange, TimeFrame
 from .founder import Founder
+from .founder_registry import FounderRegistry
 from .price import Price
+from .price_series import PriceSeries
+from .trading_calendar import TradingCalendar
 
 
 __all__ = [
@@ -30,5 +33,8 @@ __all__ = [
     "DateRange",
     "TimeFrame",
     "Founder",
+    "FounderRegistry",
     "Price",
+    "PriceSeries",
+    "TradingCalendar",
 ]
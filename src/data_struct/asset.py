@@ -17,18 +17,37 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+import multiprocessing
 import pandas as pd
-from typing import List, Optional, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Dict, Union
 
 
 from .asset_distribution import AssetDistribution
 from .date_range import DateRange
 from .founder import Founder
+from .founder_registry import FounderRegistry
 from .price import Price
-from utils import DataFrameUtils
+from .price_series import PriceSeries
+from utils import ArrayUtils
 
 
 class Asset:
+    # Raw CSV columns with a known type; list columns are decoded separately
+    CSV_DTYPES = {
+        "code": str,
+        "name": str,
+        "founder_code": str,
+        "founder_name": str,
+        "category": str,
+        "risk_score": "Int64",
+        "market_share": "float64",
+        "is_in_tefas": "boolean",
+        "prices": str,
+        "asset_distributions": str,
+    }
+    CSV_CHUNK_SIZE = 250
+
     def __init__(
         self,
         code: str,
@@ -38,7 +57,7 @@ class Asset:
         risk_score: Optional[int],
         market_share: float,
         is_in_tefas: bool,
-        prices: List[Price],
+        prices: Union[PriceSeries, List[Price]],
         asset_distributions: List[AssetDistribution],
     ):
         self.code = code
@@ -49,12 +68,12 @@ class Asset:
         self.market_share = market_share
         self._is_in_tefas = is_in_tefas
         self.asset_distributions = asset_distributions
-        self.prices = prices
+        self.prices = PriceSeries.from_prices(prices) if isinstance(prices, list) else prices
         self._check_validity()
 
         self.date_range = DateRange(
-            start_date=prices[0].get_date(),
-            end_date=prices[-1].get_date(),
+            start_date=self.prices.get_first_date(),
+            end_date=self.prices.get_last_date(),
         )
 
     def get_code(self) -> str:
@@ -66,6 +85,10 @@ class Asset:
     def get_founder(self) -> Founder:
         return self.founder
 
+    def set_founder(self, founder: Founder):
+        self.founder = founder
+        self._check_validity()
+
     def get_category(self) -> str:
         return self.category
 
@@ -84,57 +107,43 @@ class Asset:
     def get_last_price(self) -> Price:
         return self.get_prices()[-1]
 
-    def get_prices(self, date_range: Optional[DateRange] = None) -> List[Price]:
+    def get_prices(self, date_range: Optional[DateRange] = None) -> PriceSeries:
         if date_range is None:
             return self.prices
 
-        return [
-            p for p in self.prices
-            if date_range.get_start_date() <= p.get_date() <= date_range.get_end_date()
-        ]
+        return self.prices.get_prices(date_range)
 
     def get_price_change_ratio(self, date_range: Optional[DateRange] = None) -> float:
         if date_range is None:
-            start_price = self.prices[0].get_value()
-            end_price = self.prices[-1].get_value()
-        else:
-            filtered_prices = self.get_prices(date_range)
-            start_price = filtered_prices[0].get_value()
-            end_price = filtered_prices[-1].get_value()
+            date_range = self.get_date_range()
+
+        return self.prices.get_change_ratio(date_range)
 
-        return round(end_price / start_price - 1, 4)
+    def get_price_change_ratios(self, date_ranges: List[DateRange]) -> List[float]:
+        return self.prices.get_change_ratios(date_ranges).tolist()
 
     def get_date_range(self) -> DateRange:
         return self.date_range
 
-    def extend_prices(self, new_prices: List[Price]):
-        if not new_prices:
-            return
+    def set_prices(self, prices: Union[PriceSeries, List[Price]]):
+        self.prices = PriceSeries.from_prices(prices) if isinstance(prices, list) else prices
+        self._check_validity()
 
-        new_prices_date_range = DateRange(
-            start_date=new_prices[0].get_date(),
-            end_date=new_prices[-1].get_date()
+        self.date_range = DateRange(
+            start_date=self.prices.get_first_date(),
+            end_date=self.prices.get_last_date()
         )
-        existing_prices = self.get_prices(new_prices_date_range)
-
-        if existing_prices:
-            for price in existing_prices:
-                new_price = new_prices.pop(0)
-
-                if price.get_date() != new_price.get_date():
-                    raise ValueError(
-                        f"Price date mismatch: existing {price.get_date()} vs new {new_price.get_date()}"
-                    )
-
-                price.set_value(new_price.get_value())
 
+    def extend_prices(self, new_prices: Union[PriceSeries, List[Price]]):
+        if isinstance(new_prices, list):
+            new_prices = PriceSeries.from_prices(new_prices)
         if not new_prices:
             return
 
-        self.get_prices().extend(new_prices)
+        self.prices = self.prices.upsert(new_prices)
         self.date_range = DateRange(
-            start_date=self.get_prices()[0].get_date(),
-            end_date=self.get_prices()[-1].get_date()
+            start_date=self.prices.get_first_date(),
+            end_date=self.prices.get_last_date()
         )
 
     @staticmethod
@@ -155,7 +164,7 @@ class Asset:
             "risk_score": self.get_risk_score(),
             "market_share": self.get_market_share(),
             "is_in_tefas": self.is_in_tefas(),
-            "prices": [price.to_dict() for price in self.get_prices()],
+            "prices": self.get_prices().to_dicts(),
             "asset_distributions": [dist.to_dict() for dist in self.get_asset_distributions()],
             "date_range": self.get_date_range().to_dict(),
         }
@@ -164,13 +173,13 @@ class Asset:
     def from_dict(cls, data: dict) -> 'Asset':
         founder_code = data.get("founder_code", None)
         founder_name = data.get("founder_name", None)
-        founder = Founder(code=founder_code, name=founder_name)
+        founder = FounderRegistry.get_default().get_or_create(founder_code, founder_name)
 
         price_dicts = data.get("prices", None)
-        prices = [
-            Price.from_dict(price)
-            for price in price_dicts
-        ] if price_dicts else None
+        if isinstance(price_dicts, PriceSeries):
+            prices = price_dicts
+        else:
+            prices = PriceSeries.from_dicts(price_dicts) if price_dicts else None
 
         asset_distribution_dicts = data.get("asset_distributions", None)
         asset_distributions = [
@@ -191,14 +200,47 @@ class Asset:
         )
 
     @classmethod
-    def from_csv(cls, csv_path: str) -> List['Asset']:
-        df = pd.read_csv(csv_path, encoding="utf-8")
-        df = DataFrameUtils.postprocess_dataframe(df)
+    def from_csv(cls, csv_path: str, workers: int = 0) -> List['Asset']:
+        df = pd.read_csv(
+            csv_path,
+            encoding="utf-8",
+            usecols=lambda column: column in cls.CSV_DTYPES,
+            dtype=cls.CSV_DTYPES,
+            keep_default_na=False,
+            na_values={"risk_score": [""], "market_share": [""], "is_in_tefas": [""]},
+        )
+        rows = df.to_dict(orient="records")
+
+        if workers <= 1 or len(rows) <= cls.CSV_CHUNK_SIZE:
+            return cls._from_csv_rows(rows)
+
+        chunks = [rows[i:i + cls.CSV_CHUNK_SIZE] for i in range(0, len(rows), cls.CSV_CHUNK_SIZE)]
+        # Spawned like the parse workers of FundDataManager, never forked
+        # from a process that may be running other threads.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            assets = [asset for assets in executor.map(cls._from_csv_rows, chunks) for asset in assets]
+
+        # Founders unpickled from the workers are shared like the ones read in this process
+        founder_registry = FounderRegistry.get_default()
+        for asset in assets:
+            asset.set_founder(founder_registry.intern(asset.get_founder()))
+        return assets
+
+    @classmethod
+    def _from_csv_rows(cls, rows: List[dict]) -> List['Asset']:
+        assets = []
+        for row in rows:
+            prices = row.get("prices", None)
+            if prices:
+                dates, values = ArrayUtils.decode_price_records(prices)
+                row["prices"] = PriceSeries(dates=dates, values=values)
+
+            asset_distributions = row.get("asset_distributions", None)
+            if asset_distributions:
+                row["asset_distributions"] = ArrayUtils.decode_distribution_records(asset_distributions)
 
-        return [
-            cls.from_dict(row)
-            for row in df.to_dict(orient="records")
-        ]
+            assets.append(cls.from_dict(row))
+        return assets
 
     def _check_validity(self) -> bool:
         if not self.get_code():
@@ -233,10 +275,8 @@ class Asset:
             raise ValueError("Asset TEFAS status must be a boolean.")
         if not self.get_prices():
             raise ValueError("Prices cannot be empty.")
-        if not isinstance(self.get_prices(), list):
-            raise ValueError("Prices must be a list.")
-        if not all(isinstance(price, Price) for price in self.get_prices()):
-            raise ValueError("All prices must be instances of the Price class.")
+        if not isinstance(self.get_prices(), PriceSeries):
+            raise ValueError("Prices must be a PriceSeries instance.")
         if not self.get_asset_distributions():
             raise ValueError("Asset distributions cannot be empty.")
         if not isinstance(self.get_asset_distributions(), list):
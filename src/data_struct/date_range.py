@@ -17,6 +17,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+import numpy as np
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from enum import Enum, auto
@@ -38,10 +39,10 @@ class DateRange:
         return self.end_date
 
     def get_all_dates(self) -> List[date]:
-        return [
-            self.get_start_date() + relativedelta(days=i)
-            for i in range((self.get_end_date() - self.get_start_date()).days + 1)
-        ]
+        return np.arange(
+            np.datetime64(self.get_start_date(), "D"),
+            np.datetime64(self.get_end_date(), "D") + 1,
+        ).tolist()
 
     def to_dict(self) -> dict:
         return {
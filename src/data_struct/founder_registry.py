@@ -0,0 +1,94 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .founder import Founder
+
+
+class FounderRegistry:
+    default_registry: Optional["FounderRegistry"] = None
+
+
+    def __init__(self, founders: Optional[Iterable[Founder]] = None):
+        # Both dictionaries are replaced instead of modified, so lookups from
+        # the fetching threads never need the lock, only additions take it.
+        self.lock = threading.Lock()
+        self.founders: Dict[str, Founder] = {}
+        self.interned: Dict[Tuple[str, str], Founder] = {}
+
+        if founders is not None:
+            self.refresh(founders)
+
+    @classmethod
+    def get_default(cls) -> "FounderRegistry":
+        if cls.default_registry is None:
+            cls.default_registry = cls()
+        return cls.default_registry
+
+    @classmethod
+    def set_default(cls, registry: "FounderRegistry") -> None:
+        cls.default_registry = registry
+
+    def get(self, code: Optional[str]) -> Optional[Founder]:
+        if not code:
+            return None
+        return self.founders.get(code, None)
+
+    def get_founders(self) -> List[Founder]:
+        return list(self.founders.values())
+
+    def get_or_create(self, code: str, name: str) -> Founder:
+        founder = self.interned.get((code, name), None)
+        if founder is not None:
+            return founder
+        return self.intern(Founder(code=code, name=name))
+
+    def intern(self, founder: Optional[Founder]) -> Optional[Founder]:
+        # One shared instance per founder code and name, e.g. for every
+        # asset read from a file or parsed in another process.
+        if founder is None:
+            return None
+
+        key = (founder.get_code(), founder.get_name())
+        interned = self.interned.get(key, None)
+        if interned is not None:
+            return interned
+
+        with self.lock:
+            interned = self.interned.get(key, None)
+            if interned is None:
+                self.interned = {**self.interned, key: founder}
+                interned = founder
+            return interned
+
+    def refresh(self, founders: Iterable[Founder]) -> None:
+        # Founders of the new listing replace the ones with the same code,
+        # instances are kept for the founders that did not change.
+        with self.lock:
+            interned = dict(self.interned)
+            index = dict(self.founders)
+            for founder in founders:
+                key = (founder.get_code(), founder.get_name())
+                founder = interned.setdefault(key, founder)
+                index[founder.get_code()] = founder
+
+            self.interned = interned
+            self.founders = index
@@ -0,0 +1,190 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import numpy as np
+from datetime import date
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+from .date_range import DateRange
+from .price import Price
+from utils import DateUtils
+
+
+class PriceSeries:
+    DATE_DTYPE = "datetime64[D]"
+    VALUE_DTYPE = np.float64
+
+    def __init__(self, dates: np.ndarray, values: np.ndarray):
+        self.dates = np.asarray(dates, dtype=self.DATE_DTYPE)
+        self.values = np.asarray(values, dtype=self.VALUE_DTYPE)
+        self._check_validity()
+
+    def get_dates(self) -> np.ndarray:
+        return self.dates
+
+    def get_values(self) -> np.ndarray:
+        return self.values
+
+    def get_first_date(self) -> date:
+        return self.dates[0].item()
+
+    def get_last_date(self) -> date:
+        return self.dates[-1].item()
+
+    def get_bounds(self, date_range: DateRange) -> Tuple[int, int]:
+        start = np.searchsorted(self.dates, np.datetime64(date_range.get_start_date(), "D"), side="left")
+        stop = np.searchsorted(self.dates, np.datetime64(date_range.get_end_date(), "D"), side="right")
+        return int(start), int(stop)
+
+    def get_prices(self, date_range: DateRange) -> "PriceSeries":
+        start, stop = self.get_bounds(date_range)
+        return self[start:stop]
+
+    def get_change_ratio(self, date_range: DateRange) -> float:
+        # Same as get_change_ratios, a range without any price in it gives NaN
+        start, stop = self.get_bounds(date_range)
+        if start >= stop:
+            return float("nan")
+
+        return round(float(self.values[stop - 1] / self.values[start] - 1), 4)
+
+    def get_change_ratios(self, date_ranges: Sequence[DateRange]) -> np.ndarray:
+        # Every window is resolved with one searchsorted call per side,
+        # windows without any price in them get NaN.
+        start_dates = np.array([dr.get_start_date() for dr in date_ranges], dtype=self.DATE_DTYPE)
+        end_dates = np.array([dr.get_end_date() for dr in date_ranges], dtype=self.DATE_DTYPE)
+
+        starts = np.searchsorted(self.dates, start_dates, side="left")
+        lasts = np.searchsorted(self.dates, end_dates, side="right") - 1
+        valid = starts <= lasts
+
+        ratios = np.full(len(date_ranges), np.nan)
+        ratios[valid] = self.values[lasts[valid]] / self.values[starts[valid]] - 1
+        return np.round(ratios, 4)
+
+    def upsert(self, new_prices: "PriceSeries") -> "PriceSeries":
+        return PriceSeries.upsert_all([self], [new_prices])[0]
+
+    @staticmethod
+    def upsert_all(series: Sequence["PriceSeries"], updates: Sequence[Optional["PriceSeries"]]) -> List["PriceSeries"]:
+        # Merges every update into its series in a single pass over all prices:
+        # new prices overwrite the ones of the same date and are inserted
+        # in date order otherwise, so gaps on either side are fine.
+        lengths = np.array([len(s) for s in series], dtype=np.int64)
+        update_lengths = np.array([len(u) if u is not None else 0 for u in updates], dtype=np.int64)
+        if not update_lengths.any():
+            return list(series)
+
+        dates = PriceSeries._concatenate([s.get_dates() for s in series], PriceSeries.DATE_DTYPE)
+        values = PriceSeries._concatenate([s.get_values() for s in series], PriceSeries.VALUE_DTYPE)
+        keys = PriceSeries._get_keys(lengths, dates)
+
+        present = [u for u in updates if u is not None]
+        new_dates = PriceSeries._concatenate([u.get_dates() for u in present], PriceSeries.DATE_DTYPE)
+        new_values = PriceSeries._concatenate([u.get_values() for u in present], PriceSeries.VALUE_DTYPE)
+        new_groups = np.repeat(np.arange(len(series)), update_lengths)
+        new_keys = PriceSeries._get_keys(update_lengths, new_dates)
+
+        positions = np.searchsorted(keys, new_keys)
+        matched = positions < len(keys)
+        matched[matched] = keys[positions[matched]] == new_keys[matched]
+
+        values[positions[matched]] = new_values[matched]
+        inserted = ~matched
+        dates = np.insert(dates, positions[inserted], new_dates[inserted])
+        values = np.insert(values, positions[inserted], new_values[inserted])
+
+        lengths += np.bincount(new_groups[inserted], minlength=len(series))
+        stops = np.cumsum(lengths)
+        starts = stops - lengths
+        return [
+            PriceSeries._from_valid_arrays(dates[start:stop], values[start:stop])
+            for start, stop in zip(starts.tolist(), stops.tolist())
+        ]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __iter__(self) -> Iterator[Price]:
+        for d, v in zip(self.dates.tolist(), self.values.tolist()):
+            yield Price(date=d, value=v)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Price, "PriceSeries"]:
+        if isinstance(key, slice):
+            # Slices are views on the same arrays, already validated
+            return PriceSeries._from_valid_arrays(self.dates[key], self.values[key])
+
+        return Price(date=self.dates[key].item(), value=float(self.values[key]))
+
+    def to_dicts(self) -> List[dict]:
+        return [
+            {"date": d, "value": v}
+            for d, v in zip(DateUtils.format_dates(self.dates), self.values.tolist())
+        ]
+
+    @classmethod
+    def from_dicts(cls, data: List[dict]) -> "PriceSeries":
+        try:
+            values = [float(price["value"]) for price in data]
+        except (KeyError, TypeError):
+            raise ValueError("Price values must be numbers.")
+
+        return cls(
+            dates=DateUtils.parse_dates([price.get("date", "") for price in data]),
+            values=values,
+        )
+
+    @classmethod
+    def from_prices(cls, prices: List[Price]) -> "PriceSeries":
+        return cls(
+            dates=[price.get_date() for price in prices],
+            values=[price.get_value() for price in prices],
+        )
+
+    @staticmethod
+    def _get_keys(lengths: np.ndarray, dates: np.ndarray) -> np.ndarray:
+        # One sorted int64 key per price of series concatenated in order: the series index
+        # in the high bits, the day (offset to stay positive) in the low bits.
+        groups = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        return (groups << 32) + dates.astype(np.int64) + (1 << 31)
+
+    @staticmethod
+    def _concatenate(arrays: List[np.ndarray], dtype) -> np.ndarray:
+        # Always a fresh array, inputs may be shared or read-only
+        return np.concatenate(arrays).astype(dtype, copy=False) if arrays else np.empty(0, dtype=dtype)
+
+    @classmethod
+    def _from_valid_arrays(cls, dates: np.ndarray, values: np.ndarray) -> "PriceSeries":
+        series = cls.__new__(cls)
+        series.dates = dates
+        series.values = values
+        return series
+
+    def _check_validity(self) -> bool:
+        if self.dates.ndim != 1 or self.values.ndim != 1:
+            raise ValueError("Price dates and values must be one-dimensional.")
+        if len(self.dates) != len(self.values):
+            raise ValueError("Price dates and values must have the same length.")
+        if np.any(np.isnat(self.dates)):
+            raise ValueError("Price dates cannot be empty.")
+        if np.any(self.dates[1:] <= self.dates[:-1]):
+            raise ValueError("Price dates must be strictly increasing.")
+        if not np.all(self.values > 0):
+            raise ValueError("Price values must be positive numbers.")
+        return True
@@ -0,0 +1,174 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import logging
+import numpy as np
+from datetime import date
+from typing import Iterable, Optional
+
+from .date_range import DateRange
+
+
+class TradingCalendar:
+    DATE_DTYPE = "datetime64[D]"
+    WEEKMASK = "1111100"
+    HOLIDAY_YEARS = range(2017, 2031)
+
+    # Official holidays on fixed days of the year, as (month, day)
+    FIXED_HOLIDAYS = [
+        (1, 1),     # Yılbaşı
+        (4, 23),    # Ulusal Egemenlik ve Çocuk Bayramı
+        (5, 1),     # Emek ve Dayanışma Günü
+        (5, 19),    # Atatürk'ü Anma, Gençlik ve Spor Bayramı
+        (7, 15),    # Demokrasi ve Milli Birlik Günü
+        (8, 30),    # Zafer Bayramı
+        (10, 29),   # Cumhuriyet Bayramı
+    ]
+    # Religious holidays follow the lunar calendar, as (first day, number of days).
+    # Half days on the eves are trading days.
+    RELIGIOUS_HOLIDAYS = [
+        (date(2017, 6, 25), 3), (date(2017, 9, 1), 4),
+        (date(2018, 6, 15), 3), (date(2018, 8, 21), 4),
+        (date(2019, 6, 4), 3), (date(2019, 8, 11), 4),
+        (date(2020, 5, 24), 3), (date(2020, 7, 31), 4),
+        (date(2021, 5, 13), 3), (date(2021, 7, 20), 4),
+        (date(2022, 5, 2), 3), (date(2022, 7, 9), 4),
+        (date(2023, 4, 21), 3), (date(2023, 6, 28), 4),
+        (date(2024, 4, 10), 3), (date(2024, 6, 16), 4),
+        (date(2025, 3, 30), 3), (date(2025, 6, 6), 4),
+        (date(2026, 3, 20), 3), (date(2026, 5, 27), 4),
+        (date(2027, 3, 9), 3), (date(2027, 5, 16), 4),
+        (date(2028, 2, 26), 3), (date(2028, 5, 5), 4),
+        (date(2029, 2, 14), 3), (date(2029, 4, 24), 4),
+        (date(2030, 2, 4), 3), (date(2030, 4, 13), 4),
+    ]
+
+    default_calendar: Optional["TradingCalendar"] = None
+
+
+    def __init__(self, holidays: Optional[Iterable[date]] = None):
+        if holidays is None:
+            holidays = TradingCalendar.get_default_holidays()
+
+        self.holidays = np.unique(np.array(list(holidays), dtype=self.DATE_DTYPE))
+        self._check_validity()
+
+        self.calendar = np.busdaycalendar(weekmask=self.WEEKMASK, holidays=self.holidays)
+        self.coverage_warned = False
+
+    @classmethod
+    def get_default(cls) -> "TradingCalendar":
+        if cls.default_calendar is None:
+            cls.default_calendar = cls()
+        return cls.default_calendar
+
+    @classmethod
+    def add_default_holidays(cls, holidays: Iterable[date]) -> None:
+        # The default calendar is shared by the fetching threads,
+        # so it is replaced instead of modified.
+        cls.default_calendar = cls.get_default().with_holidays(holidays)
+
+    @staticmethod
+    def get_default_holidays() -> np.ndarray:
+        fixed = [
+            date(year, month, day)
+            for year in TradingCalendar.HOLIDAY_YEARS
+            for month, day in TradingCalendar.FIXED_HOLIDAYS
+        ]
+        religious = [
+            np.datetime64(start_date, "D") + np.arange(days)
+            for start_date, days in TradingCalendar.RELIGIOUS_HOLIDAYS
+        ]
+        return np.concatenate([np.array(fixed, dtype=TradingCalendar.DATE_DTYPE), *religious])
+
+    @staticmethod
+    def get_last_holiday_year() -> int:
+        # Last year that both the fixed and the religious holidays are known for
+        return min(
+            TradingCalendar.HOLIDAY_YEARS[-1],
+            max(start_date.year for start_date, _ in TradingCalendar.RELIGIOUS_HOLIDAYS),
+        )
+
+    def get_holidays(self) -> np.ndarray:
+        return self.holidays
+
+    def with_holidays(self, holidays: Iterable[date]) -> "TradingCalendar":
+        return TradingCalendar(np.concatenate([
+            self.holidays,
+            np.array(list(holidays), dtype=self.DATE_DTYPE),
+        ]))
+
+    def is_trading_day(self, dates) -> np.ndarray:
+        dates = np.asarray(dates, dtype=self.DATE_DTYPE)
+        if dates.size:
+            self._check_coverage(dates.max())
+        return np.is_busday(dates, busdaycal=self.calendar)
+
+    def get_trading_dates(self, date_range: DateRange) -> np.ndarray:
+        dates = np.arange(
+            np.datetime64(date_range.get_start_date(), "D"),
+            np.datetime64(date_range.get_end_date(), "D") + 1,
+        )
+        return dates[self.is_trading_day(dates)]
+
+    def count_trading_days(self, date_range: DateRange) -> int:
+        self._check_coverage(date_range.get_end_date())
+        return int(np.busday_count(
+            np.datetime64(date_range.get_start_date(), "D"),
+            np.datetime64(date_range.get_end_date(), "D") + 1,
+            busdaycal=self.calendar,
+        ))
+
+    def get_next_trading_day(self, date_obj: date) -> date:
+        # The given day itself if it is a trading day
+        self._check_coverage(date_obj)
+        return np.busday_offset(np.datetime64(date_obj, "D"), 0, roll="forward", busdaycal=self.calendar).item()
+
+    def trim(self, date_range: DateRange) -> Optional[DateRange]:
+        # Narrow the range down to its first and last trading day,
+        # None if there is no trading day in it.
+        self._check_coverage(date_range.get_end_date())
+        start_date = np.busday_offset(
+            np.datetime64(date_range.get_start_date(), "D"), 0, roll="forward", busdaycal=self.calendar,
+        )
+        end_date = np.busday_offset(
+            np.datetime64(date_range.get_end_date(), "D"), 0, roll="backward", busdaycal=self.calendar,
+        )
+        if start_date > end_date:
+            return None
+
+        return DateRange(start_date=start_date.item(), end_date=end_date.item())
+
+    def _check_coverage(self, last_date) -> None:
+        # Holidays past the table would silently count as trading days
+        if self.coverage_warned or np.datetime64(last_date, "D").item().year <= self.get_last_holiday_year():
+            return
+
+        self.coverage_warned = True
+        logging.warning(
+            f"Trading calendar only knows the holidays until the end of {self.get_last_holiday_year()}, "
+            f"later holidays are treated as trading days."
+        )
+
+    def _check_validity(self) -> bool:
+        if self.holidays.ndim != 1:
+            raise ValueError("Holidays must be one-dimensional.")
+        if np.any(np.isnat(self.holidays)):
+            raise ValueError("Holidays cannot be empty.")
+        return True
@@ -18,14 +18,17 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
 import argparse
+import json
 import logging
 import pandas as pd
 from pathlib import Path
 
-from data_manager import DataProcessor, FundDataManager, PriceUpdater
-from data_struct import Asset
-from tefas_requests import FounderFetcher, FundCodeFetcher
-from utils import DataFrameUtils
+from data_manager import AssetStorage, AssetWriter, CheckpointJournal, DataProcessor, FundDataManager, PriceUpdater
+from data_struct import DateRange, FounderRegistry
+from tefas_requests import (
+    ConcurrencyController, FixtureStore, FounderFetcher, RateLimiter, ResponseCache, TEFASRequester,
+)
+from utils import DataFrameUtils, DateUtils, Profiler
 
 
 # Configurations
@@ -44,32 +47,69 @@ class Main:
         founders_csv_filename: str = "founders.csv",
         raw_csv_filename: str = "fund_data_raw.csv",
         processed_csv_filename: str = "fund_data.csv",
+        checkpoint_filename: str = "checkpoint.jsonl",
+        failures_filename: str = "failures.json",
     ):
         self.args = self.parse_args()
         self.founders_csv_filename = founders_csv_filename
         self.raw_csv_filename = raw_csv_filename
         self.processed_csv_filename = processed_csv_filename
+        self.checkpoint_filename = checkpoint_filename
+        self.failures_filename = failures_filename
         self._parse_args()
 
         self.input_path = self._parse_input_path()
+        self.price_change_columns = self._parse_price_change_columns()
+        self.backfill_date_range = self._parse_backfill_date_range()
+        self.storage_format = AssetStorage.StorageFormat.get_storage_format(self.args.format)
         self.output_directory_path = self._parse_output_directory_path()
         self.founders_output_path = self._parse_file_output_path(self.founders_csv_filename)
-        self.raw_output_path = self._parse_file_output_path(self.raw_csv_filename)
+        self.raw_output_path = self._parse_raw_output_path()
         self.processed_output_path = self._parse_file_output_path(self.processed_csv_filename)
+        self.checkpoint_path = self._parse_file_output_path(self.checkpoint_filename)
+        self.failures_output_path = self._parse_file_output_path(self.failures_filename)
         self._check_validity()
 
-        self.founder_data = self.get_founder_data()
+        if self.args.base_url:
+            TEFASRequester.set_base_url(self.args.base_url)
+        TEFASRequester.set_pool_size(self.args.max_workers)
+        TEFASRequester.set_concurrency_controller(
+            ConcurrencyController(max_limit=self.args.max_workers, adaptive=self.args.adaptive)
+        )
+        TEFASRequester.set_rate_limiter(self._create_rate_limiter())
+        if self.args.record_fixtures:
+            TEFASRequester.set_fixture_store(FixtureStore(Path(self.args.record_fixtures)))
+        if self.args.cache_dir:
+            TEFASRequester.set_response_cache(
+                ResponseCache(Path(self.args.cache_dir), max_size=self.args.cache_size * 1024 * 1024)
+            )
+        self.profiler = Profiler(
+            enabled=self.args.profile or bool(self.args.profile_report or self.args.profile_dump),
+            trace_memory=self.args.profile_memory,
+            cprofile=bool(self.args.profile_dump),
+        )
+        Profiler.set_default(self.profiler)
+        self.profiler.start()
+
+        with self.profiler.stage("founders"):
+            self.founder_data = self.get_founder_data()
 
     def parse_args(self):
         parser = argparse.ArgumentParser(description="TEFAS Data Exporter")
         parser.add_argument(
             "--input", type=str,
-            help="Optional path to a raw fund CSV. If provided, skips fetching real-time data."
+            help="Optional path to a raw fund CSV, JSON Lines file or Parquet directory. If provided, skips fetching real-time data."
         )
         parser.add_argument(
             "--output", type=str, default="output",
             help="Output directory to save the files. (default: 'output')"
         )
+        parser.add_argument(
+            "--format", type=str,
+            help="Storage format of the raw fund data, 'csv', 'jsonl' or 'parquet'. Raw data is written as the funds "
+                 "are fetched, but the processed data needs every fund in memory, add --no-processed to avoid that. "
+                 "(default: 'csv')"
+        )
         parser.add_argument(
             "--no-processed", action="store_true",
             help="Do not include processed data in the output."
@@ -90,62 +130,254 @@ class Main:
             '--range', type=str,
             help="The time range for which to fetch data. (default: 'YEAR_1')"
         )
+        parser.add_argument(
+            "--backfill", type=str,
+            help="Start date (dd.mm.yyyy) of the price history to fetch in bulk. Fund pages are only fetched for their details."
+        )
+        parser.add_argument(
+            "--delta", type=str,
+            help="Previous raw fund data to update, fetching fund pages only for new and stale funds "
+                 "and the prices of all others from the history endpoint. Details only shown on fund pages, "
+                 "e.g. market shares, may be up to --delta-refresh-days old."
+        )
+        parser.add_argument(
+            "--delta-refresh-days", type=int, default=7,
+            help="Days in which the pages of all funds are reloaded once in turn with --delta, "
+                 "1 reloads every page like a full fetch. (default: 7)"
+        )
+        parser.add_argument(
+            "--resume", action="store_true",
+            help="Resume an interrupted fetch from its checkpoint journal in the output directory, fetching only the missing funds."
+        )
         parser.add_argument(
             "--max-workers", type=int, default=16,
-            help="Maximum number of workers for fetching data. (default: 16)"
+            help="Maximum number of workers and pooled connections for fetching data. (default: 16)"
+        )
+        parser.add_argument(
+            "--retry-workers", type=int,
+            help="Number of workers retrying the failed funds after all others are fetched, with a longer timeout. "
+                 "0 disables retrying. (default: a quarter of --max-workers)"
+        )
+        parser.add_argument(
+            "--adaptive", action="store_true",
+            help="Adapt the number of concurrent requests to the server, up to --max-workers. "
+                 "By default it is fixed at --max-workers."
+        )
+        parser.add_argument(
+            "--rate-limits", nargs='*', type=str,
+            help="Limit requests per second with the default limits, overridden by the given ones "
+                 "as '<endpoint>=<rate>[:<burst>]', e.g. 'FonAnaliz.aspx=20:40 default=10'. "
+                 "By default requests are not rate limited."
+        )
+        parser.add_argument(
+            "--window-days", type=int, default=30,
+            help="Number of days per price history request when updating or backfilling. (default: 30)"
+        )
+        parser.add_argument(
+            "--cache-dir", type=str,
+            help="Optional directory to cache responses in, so that repeated runs skip unchanged downloads."
+        )
+        parser.add_argument(
+            "--cache-size", type=int, default=512,
+            help="Maximum size of the response cache in megabytes. (default: 512)"
+        )
+        parser.add_argument(
+            "--base-url", type=str,
+            help="Base URL of the TEFAS website, e.g. of a local stand-in server. (default: 'https://www.tefas.gov.tr')"
+        )
+        parser.add_argument(
+            "--record-fixtures", type=str,
+            help="Optional directory to record every response in, to be replayed by the stand-in server."
+        )
+        parser.add_argument(
+            "--engine", type=str,
+            help="The engine used for fetching fund pages, 'thread' or 'async'. (default: 'thread')"
+        )
+        parser.add_argument(
+            "--parse-workers", type=int, default=0,
+            help="Number of processes for parsing fund pages and loading raw CSV input. "
+                 "0 parses fund pages in the fetching workers and loads CSV input in the main process. (default: 0)"
+        )
+        parser.add_argument(
+            "--price-change-columns", nargs='+', type=str,
+            help="Price change windows of the processed data, e.g. 'days_1 weeks_2 months_6 years_3'."
+        )
+        parser.add_argument(
+            "--profile", action="store_true",
+            help="Log wall time, CPU time and peak memory of every stage and the latencies of every endpoint."
+        )
+        parser.add_argument(
+            "--profile-memory", action="store_true",
+            help="Also trace Python allocations for the peak memory of every stage, which slows the run down."
+        )
+        parser.add_argument(
+            "--profile-report", type=str,
+            help="Optional JSON file to save the profile in, implies --profile."
+        )
+        parser.add_argument(
+            "--profile-dump", type=str,
+            help="Optional file to save cProfile statistics of the main thread in, implies --profile."
         )
         return parser.parse_args()
 
     def get_founder_data(self):
         founders = FounderFetcher.fetch_founders()
-        FundCodeFetcher.set_founders(founders)
+        FounderRegistry.get_default().refresh(founders)
         return founders
 
     def run(self):
+        try:
+            self._run()
+        finally:
+            self._log_connection_stats()
+            self._save_profile()
+
+    def _run(self):
+        profiler = self.profiler
+
         if self.args.get_only_founders:
-            raw_df = pd.DataFrame([obj.to_dict() for obj in self.founder_data])
-            raw_df.to_csv(self.founders_output_path, index=False, encoding="utf-8")
+            with profiler.stage("write_founders"):
+                raw_df = pd.DataFrame([obj.to_dict() for obj in self.founder_data])
+                raw_df.to_csv(self.founders_output_path, index=False, encoding="utf-8")
             logging.info(f"Founders data saved to {self.founders_output_path}")
             return
 
         if self.args.update:
-            assets = Asset.from_csv(self.input_path)
-            price_updater = PriceUpdater(assets)
-            updated_assets = price_updater.update_prices()
+            with profiler.stage("read_input"):
+                assets = AssetStorage.read_assets(self.input_path, workers=self.args.parse_workers)
+            with profiler.stage("update_prices"):
+                price_updater = PriceUpdater(assets, window_days=self.args.window_days)
+                updated_assets = price_updater.update_prices()
 
-            raw_df = pd.DataFrame([obj.to_dict() for obj in updated_assets])
-            raw_df = DataFrameUtils.postprocess_dataframe(raw_df)
-            raw_df.to_csv(self.raw_output_path, index=False, encoding="utf-8")
+            with profiler.stage("write_raw"):
+                AssetStorage.write_assets(updated_assets, self.raw_output_path, self.storage_format)
             return
 
         if not self.args.input:
-            manager = FundDataManager(
-                fund_price_range=self.args.range,
-                additional_founders=self.args.founders,
-                max_workers=self.args.max_workers,
-            )
-            fund_codes_data = manager.get_fund_codes_data()
-            assets = manager.fetch_fund_data(fund_codes_data)
+            # Raw data is streamed to the output as the funds are fetched,
+            # the assets are only kept in memory for the processed data.
+            # Every finished fund is also journaled for --resume.
+            checkpoint_options = {
+                CheckpointJournal.DATE: DateUtils.format_date(DateUtils.get_today()),
+                "range": self.args.range,
+                "founders": self.args.founders,
+                "backfill": self.args.backfill,
+                "delta": self.args.delta,
+            }
+            with CheckpointJournal(self.checkpoint_path, checkpoint_options, resume=self.args.resume) as checkpoint_journal, \
+                    AssetWriter(self.raw_output_path, self.storage_format) as asset_writer:
+                manager = FundDataManager(
+                    fund_price_range=self.args.range,
+                    additional_founders=self.args.founders,
+                    max_workers=self.args.max_workers,
+                    retry_workers=self.args.retry_workers,
+                    engine=self.args.engine,
+                    parse_workers=self.args.parse_workers,
+                    asset_writer=asset_writer,
+                    keep_assets=not self.args.no_processed,
+                    checkpoint_journal=checkpoint_journal,
+                )
+                with profiler.stage("fund_codes"):
+                    fund_codes_data = manager.get_fund_codes_data()
+                if self.args.delta:
+                    with profiler.stage("read_baseline"):
+                        baseline_assets = AssetStorage.read_assets(Path(self.args.delta), workers=self.args.parse_workers)
+                    with profiler.stage("delta"):
+                        assets = manager.delta_fund_data(
+                            fund_codes_data, baseline_assets, self.args.window_days, self.args.delta_refresh_days,
+                        )
+                elif self.backfill_date_range:
+                    with profiler.stage("backfill"):
+                        assets = manager.backfill_fund_data(fund_codes_data, self.backfill_date_range, self.args.window_days)
+                else:
+                    with profiler.stage("fetch_funds"):
+                        assets = manager.fetch_fund_data(fund_codes_data)
 
-            raw_df = pd.DataFrame([obj.to_dict() for obj in assets])
-            raw_df = DataFrameUtils.postprocess_dataframe(raw_df)
-            raw_df.to_csv(self.raw_output_path, index=False, encoding="utf-8")
+            failures = manager.get_failures()
+            if failures:
+                with open(self.failures_output_path, "w", encoding="utf-8") as f:
+                    json.dump(manager.get_failure_report(), f, indent=2, ensure_ascii=False)
+                logging.warning(
+                    f"Fetching failed for {len(failures)} funds, see {self.failures_output_path}. "
+                    f"Run again with --resume to fetch only these: {', '.join(sorted(failures))}"
+                )
+            else:
+                checkpoint_journal.remove()
+                self.failures_output_path.unlink(missing_ok=True)
 
         if not self.args.no_processed:
             if self.args.input:
-                assets = Asset.from_csv(self.input_path)
+                with profiler.stage("read_input"):
+                    assets = AssetStorage.read_assets(self.input_path, workers=self.args.parse_workers)
+
+            with profiler.stage("process"):
+                processor = DataProcessor(assets, self.price_change_columns)
+                processed_df = processor.process()
+                processed_df = DataFrameUtils.postprocess_dataframe(processed_df)
+            with profiler.stage("write_processed"):
+                processed_df.to_csv(self.processed_output_path, index=False, encoding="utf-8")
+
+    def _save_profile(self):
+        self.profiler.stop()
+        self.profiler.log_summary()
+
+        if self.args.profile_report:
+            self.profiler.write_report(Path(self.args.profile_report))
+            logging.info(f"Profile report saved to {self.args.profile_report}")
+        if self.args.profile_dump:
+            self.profiler.dump_stats(Path(self.args.profile_dump))
+            logging.info(f"cProfile statistics saved to {self.args.profile_dump}")
 
-            processor = DataProcessor(assets)
-            processed_df = processor.process()
-            processed_df = DataFrameUtils.postprocess_dataframe(processed_df)
-            processed_df.to_csv(self.processed_output_path, index=False, encoding="utf-8")
+    def _log_connection_stats(self):
+        stats = TEFASRequester.get_connection_stats()
+        logging.info(
+            f"HTTP connections: {stats['requests']} requests, "
+            f"{stats['new_connections']} new, {stats['reused_connections']} reused"
+        )
+
+        controller_stats = TEFASRequester.concurrency_controller.get_stats()
+        if self.args.adaptive:
+            logging.info(
+                f"Concurrency: limit {controller_stats['limit']}, "
+                f"{controller_stats['increases']} increases, {controller_stats['decreases']} decreases"
+            )
+
+        cache_stats = TEFASRequester.get_cache_stats()
+        if cache_stats is not None:
+            logging.info(
+                f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['expired']} expired), {cache_stats['writes']} writes, "
+                f"{cache_stats['evictions']} evictions"
+            )
+
+    def _create_rate_limiter(self):
+        if self.args.rate_limits is None:
+            return RateLimiter()
+
+        limits = dict(RateLimiter.parse_limit(value) for value in self.args.rate_limits)
+        default_limit = limits.pop("default", None)
+        return RateLimiter.create_default(limits=limits, default_limit=default_limit)
 
     def _parse_input_path(self):
         if self.args.input:
             input_path = Path(self.args.input)
-            if input_path.is_file():
+            if input_path.is_file() or input_path.is_dir():
                 return input_path
 
+    def _parse_price_change_columns(self):
+        if self.args.price_change_columns:
+            return [
+                DataProcessor.parse_price_change_column(column)
+                for column in self.args.price_change_columns
+            ]
+
+    def _parse_backfill_date_range(self):
+        if self.args.backfill:
+            return DateRange(
+                start_date=DateUtils.parse_date(self.args.backfill),
+                end_date=DateUtils.get_today(),
+            )
+
     def _parse_output_directory_path(self):
         if self.args.output:
             output_path = Path(self.args.output)
@@ -154,11 +386,28 @@ class Main:
             if output_path.exists() and output_path.is_dir():
                 return output_path
 
+    def _parse_raw_output_path(self):
+        raw_output_path = self._parse_file_output_path(self.raw_csv_filename)
+        if raw_output_path and self.storage_format == AssetStorage.StorageFormat.PARQUET:
+            # Parquet data is a directory of tables named after the raw CSV file
+            return raw_output_path.with_suffix("")
+        if raw_output_path and self.storage_format == AssetStorage.StorageFormat.JSONL:
+            return raw_output_path.with_suffix(AssetStorage.JSONL_SUFFIX)
+        return raw_output_path
+
     def _parse_file_output_path(self, filename: str):
         if self.args.output and self.output_directory_path and filename:
             return self.output_directory_path / filename
 
     def _parse_args(self):
+        if self.args.delta and (self.args.input or self.args.update or self.args.get_only_founders or self.args.backfill):
+            raise ValueError("Cannot use --delta with --input, --update, --get-only-founders or --backfill.")
+        if self.args.delta and not Path(self.args.delta).exists():
+            raise ValueError("Baseline specified with --delta does not exist.")
+        if self.args.delta_refresh_days <= 0:
+            raise ValueError("Number of delta refresh days must be a positive integer.")
+        if self.args.resume and (self.args.input or self.args.update or self.args.get_only_founders):
+            raise ValueError("Can only use --resume for fetching fund data.")
         if self.args.input and self.args.no_processed:
             raise ValueError("Cannot use --input and --no-processed together.")
         if self.args.input and self.args.get_only_founders:
@@ -169,6 +418,20 @@ class Main:
             raise ValueError("Cannot use --update without an input file.")
         if self.args.update and self.args.get_only_founders:
             raise ValueError("Cannot use --update and --get-only-founders together.")
+        if self.args.backfill and self.args.input:
+            raise ValueError("Cannot use --backfill and --input together.")
+        if self.args.backfill and self.args.range:
+            raise ValueError("Cannot use --backfill and --range together.")
+        if self.args.backfill and self.args.get_only_founders:
+            raise ValueError("Cannot use --backfill and --get-only-founders together.")
+        if self.args.max_workers <= 0:
+            raise ValueError("Maximum number of workers must be a positive integer.")
+        if self.args.record_fixtures and self.args.cache_dir:
+            raise ValueError("Cannot use --record-fixtures and --cache-dir together.")
+        if self.args.cache_size <= 0:
+            raise ValueError("Maximum cache size must be a positive integer.")
+        if self.args.window_days <= 0:
+            raise ValueError("Window size must be a positive number of days.")
         if self.args.update and self.args.founders:
             raise ValueError("Cannot use --update and --founders together.")
         if self.args.get_only_founders and self.args.founders:
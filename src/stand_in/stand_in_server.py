@@ -0,0 +1,179 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from .synthetic_tefas import SyntheticTEFAS
+from tefas_requests import FixtureStore, RateLimiter
+
+
+class StandInServer:
+    # Local HTTP server in place of TEFAS, serving recorded fixtures or
+    # synthetic responses, with optional latency, errors and throttling.
+    RETRY_AFTER = 1
+
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        synthetic: Optional[SyntheticTEFAS] = None,
+        fixture_store: Optional[FixtureStore] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.synthetic = synthetic
+        self.fixture_store = fixture_store
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self._check_validity()
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.bucket = RateLimiter.TokenBucket(rate_limit, max(int(rate_limit), 1)) if rate_limit else None
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "throttled": 0,
+            "not_found": 0,
+        }
+
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "StandInServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def get_base_url(self) -> str:
+        port = self.httpd.server_address[1] if self.httpd else self.port
+        return f"http://{self.host}:{port}"
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def serve_forever(self) -> None:
+        self._create_httpd().serve_forever()
+
+    def start(self) -> None:
+        # Serves from a background thread, e.g. for benchmarks in the same process
+        httpd = self._create_httpd()
+        self.thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def respond(self, method: str, url_endpoint: str, form: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        with self.lock:
+            self.stats["requests"] += 1
+            throttled = self.bucket is not None and not self.bucket.try_take()
+            failed = not throttled and self.random.random() < self.error_rate
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            if throttled:
+                self.stats["throttled"] += 1
+            if failed:
+                self.stats["errors"] += 1
+
+        if throttled:
+            return 429, {"Retry-After": str(self.RETRY_AFTER), "Content-Type": "text/plain"}, b"Too Many Requests"
+
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return 500, {"Content-Type": "text/plain"}, b"Internal Server Error"
+
+        if self.fixture_store is not None:
+            fixture = self.fixture_store.get(method, url_endpoint, form)
+            if fixture is not None:
+                entry, content = fixture
+                return entry["status"], {"Content-Type": entry["content_type"] or "text/html"}, content
+
+        if self.synthetic is not None:
+            response = self.synthetic.handle(method, url_endpoint, form)
+            if response is not None:
+                status, content_type, body = response
+                return status, {"Content-Type": content_type}, body.encode("utf-8")
+
+        with self.lock:
+            self.stats["not_found"] += 1
+        return 404, {"Content-Type": "text/plain"}, b"Not Found"
+
+    def _create_httpd(self) -> ThreadingHTTPServer:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self._send(*stand_in.respond("GET", self.path.lstrip("/"), {}))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode("utf-8")
+                form = dict(urllib.parse.parse_qsl(body, keep_blank_values=True))
+                self._send(*stand_in.respond("POST", self.path.lstrip("/"), form))
+
+            def _send(self, status: int, headers: Dict[str, str], content: bytes):
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        return self.httpd
+
+    def _check_validity(self) -> bool:
+        if self.synthetic is None and self.fixture_store is None:
+            raise ValueError("Stand-in server needs synthetic data or fixtures to serve.")
+        if self.latency < 0 or self.jitter < 0:
+            raise ValueError("Latency and jitter cannot be negative.")
+        if not 0 <= self.error_rate <= 1:
+            raise ValueError("Error rate must be between 0 and 1.")
+        if self.rate_limit is not None and self.rate_limit <= 0:
+            raise ValueError("Rate limit must be a positive number of requests per second.")
+        return True
@@ -0,0 +1,287 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import html
+import json
+import numpy as np
+import string
+from datetime import date
+from dateutil.relativedelta import relativedelta
+from typing import Dict, List, Optional, Tuple
+
+from data_struct import DateRange, TradingCalendar
+from tefas_requests import FounderFetcher, FundCodeFetcher, FundFetcher, UpdatedPricesFetcher
+from utils import DateUtils
+
+
+class SyntheticTEFAS:
+    # Generates TEFAS responses for any number of funds, deterministic for a seed.
+    # Pages only carry the markup the fetchers read.
+    CATEGORIES = [
+        "Borçlanma Araçları Fonu",
+        "Değişken Fon",
+        "Hisse Senedi Fonu",
+        "Karma Fon",
+        "Para Piyasası Fonu",
+        "Serbest Fon",
+    ]
+    ASSETS = [
+        "Hisse Senedi",
+        "Devlet Tahvili",
+        "Ters-Repo",
+        "Vadeli Mevduat",
+        "Özel Sektör Tahvili",
+        "Yatırım Fonları Katılma Payları",
+        "Kıymetli Madenler",
+    ]
+    PERIOD_FIELD = next(iter(FundFetcher.BASE_FORM_DATA_TEMPLATE))
+    CHECKED = ' checked="checked"'
+    FUND_CODE_LENGTH = 3
+    NOT_IN_TEFAS_RATIO = 0.05
+
+
+    def __init__(
+        self,
+        fund_count: int = 100,
+        founder_count: Optional[int] = None,
+        history_years: int = 5,
+        today: Optional[date] = None,
+        seed: int = 0,
+        max_records: Optional[int] = None,
+    ):
+        self.fund_count = fund_count
+        self.founder_count = founder_count or max(1, fund_count // 25)
+        self.history_years = history_years
+        self.today = today or DateUtils.get_today()
+        self.seed = seed
+        self.max_records = max_records
+        self._check_validity()
+
+        self.founders = [
+            (f"P{self._get_letters(i, 2)}", f"Sentetik {i + 1} Portföy Yönetimi A.Ş.")
+            for i in range(self.founder_count)
+        ]
+        self.fund_codes = [self._get_letters(i, self.FUND_CODE_LENGTH) for i in range(self.fund_count)]
+        self.fund_founders = {code: self.founders[i % self.founder_count] for i, code in enumerate(self.fund_codes)}
+        # The fund label shows the title of the fund, not its code
+        self.fund_names = {
+            code: f"SENTETİK {i % self.founder_count + 1} PORTFÖY {i // self.founder_count + 1}. SERBEST FON"
+            for i, code in enumerate(self.fund_codes)
+        }
+
+        self.dates = TradingCalendar.get_default().get_trading_dates(DateRange(
+            start_date=self.today - relativedelta(years=self.history_years),
+            end_date=self.today,
+        ))
+        self.date_strs = np.array(DateUtils.format_dates(self.dates))
+        # TARIH of the history endpoint: epoch milliseconds of midnight in Turkey
+        self.timestamps = (
+            self.dates.astype(np.int64) * UpdatedPricesFetcher.DAY_MS - UpdatedPricesFetcher.TIMESTAMP_OFFSET_MS
+        )
+        self.prices: Dict[str, np.ndarray] = {}
+
+    def get_fund_codes(self) -> List[str]:
+        return self.fund_codes
+
+    def get_founders(self) -> List[Tuple[str, str]]:
+        return self.founders
+
+    def handle(self, method: str, url_endpoint: str, form: Dict[str, str]) -> Optional[Tuple[int, str, str]]:
+        path, _, query = url_endpoint.lstrip("/").partition("?")
+        query = dict(part.split("=", 1) for part in query.split("&") if "=" in part)
+
+        if path == FounderFetcher.URL_ENDPOINT and method == "GET":
+            return 200, "text/html; charset=utf-8", self.get_founders_page()
+
+        if path == FundCodeFetcher.URL_ENDPOINT and method == "POST":
+            body = self.get_fund_codes_data(form.get("kurucukod", None))
+            return 200, "application/json; charset=utf-8", json.dumps(body, ensure_ascii=False)
+
+        if path == UpdatedPricesFetcher.URL_ENDPOINT and method == "POST":
+            try:
+                start_date = DateUtils.parse_date(form["bastarih"])
+                end_date = DateUtils.parse_date(form["bittarih"])
+            except (KeyError, ValueError):
+                return 400, "text/plain; charset=utf-8", "Invalid date range."
+            body = self.get_price_history(start_date, end_date)
+            return 200, "application/json; charset=utf-8", json.dumps(body, ensure_ascii=False)
+
+        if path == FundFetcher.URL_ENDPOINT.split("?", 1)[0]:
+            code = query.get("FonKod", "")
+            period = form.get(self.PERIOD_FIELD, FundFetcher.FundRequester.YEAR_1.value) if method == "POST" \
+                else FundFetcher.FundRequester.YEAR_1.value
+            page = self.get_fund_page(code, period)
+            if page is not None:
+                return 200, "text/html; charset=utf-8", page
+
+        return None
+
+    def get_founders_page(self) -> str:
+        options = '<option value="Tümü">Tümü</option>' + "".join(
+            f'<option value="{code}">{html.escape(name)}</option>'
+            for code, name in self.founders
+        )
+        return (
+            '<html><body><form method="post" action="./FonKarsilastirma.aspx">'
+            f'<select name="ctl00$MainContent$DropDownListFounderYAT" id="DropDownListFounderYAT">{options}</select>'
+            '</form></body></html>'
+        )
+
+    def get_fund_codes_data(self, founder_code: Optional[str] = None) -> dict:
+        rows = [
+            {"FONKODU": code, "KURUCUKODU": self.fund_founders[code][0]}
+            for code in self.fund_codes
+            if founder_code is None or self.fund_founders[code][0] == founder_code
+        ]
+        return {"draw": 0, "recordsTotal": len(rows), "recordsFiltered": len(rows), "data": rows}
+
+    def get_fund_page(self, code: str, period: str) -> Optional[str]:
+        if code not in self.fund_founders:
+            return None
+        try:
+            start_date = self._get_period_start_date(FundFetcher.FundRequester(period))
+        except ValueError:
+            return None
+
+        rnd = self._get_random(code)
+        prices = self._get_prices(code)
+        start = int(np.searchsorted(self.dates, np.datetime64(start_date, "D"), side="left"))
+
+        categories = ",".join(f'"{d}"' for d in self.date_strs[start:].tolist())
+        data = ",".join(repr(v) for v in prices[start:].tolist())
+
+        amounts = rnd.dirichlet(np.ones(rnd.randint(2, len(self.ASSETS) + 1))) * 100
+        assets = rnd.choice(self.ASSETS, size=len(amounts), replace=False)
+        pie = ",".join(f"['{asset}', {amount:.2f}]" for asset, amount in zip(assets.tolist(), amounts.tolist()))
+
+        radios = "".join(
+            f'<input id="MainContent_RadioButtonListPeriod_{i}" type="radio" name="{self.PERIOD_FIELD}" '
+            f'value="{requester.value}"{self.CHECKED if requester.value == period else ""} />'
+            for i, requester in enumerate(FundFetcher.FundRequester)
+        )
+        is_in_tefas = "TEFAS'ta işlem görüyor" if rnd.rand() >= self.NOT_IN_TEFAS_RATIO else "TEFAS'ta İşlem Görmüyor"
+        market_share = f"{rnd.uniform(0, 2):.2f}".replace(".", ",")
+        last_price = f"{prices[-1]:.6f}".replace(".", ",")
+
+        return f"""<!DOCTYPE html>
+<html><head><title>{code}</title></head><body>
+<form method="post" action="./FonAnaliz.aspx?FonKod={code}" id="form1">
+<input type="hidden" name="__VIEWSTATE" id="__VIEWSTATE" value="{self._get_view_state(code, period)}" />
+<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION" value="{self.seed}" />
+<div class="main-indicators">
+<h2><span id="MainContent_FormViewMainIndicators_LabelFund">{html.escape(self.fund_names[code])}</span></h2>
+<ul>
+<li>Son Fiyat (TL)<span>{last_price}</span></li>
+<li>Kategorisi<span>{self.CATEGORIES[rnd.randint(len(self.CATEGORIES))]}</span></li>
+<li>Pazar Payı<span>%{market_share}</span></li>
+</ul>
+</div>
+<table>{radios}</table>
+<div id="chartMainContent_FonFiyatGrafik"></div>
+<div class="fund-profile">
+<table id="MainContent_DetailsViewFund">
+<tr><td class="fund-profile-header">Fonun Risk Değeri</td><td class="fund-profile-item">{rnd.randint(1, 8)}</td></tr>
+<tr><td class="fund-profile-header">Platform İşlem Durumu</td><td class="fund-profile-item">{is_in_tefas}</td></tr>
+</table>
+</div>
+<script type="text/javascript">
+//<![CDATA[
+var chartMainContent_FonFiyatGrafik = new Highcharts.Chart({{chart: {{renderTo: 'chartMainContent_FonFiyatGrafik'}}, xAxis: {{categories: [{categories}]}}, series: [{{name: 'Fiyat', data: [{data}]}}]}});
+//]]>
+</script>
+<script type="text/javascript">
+//<![CDATA[
+var chartMainContent_PieChartFonDagilim = new Highcharts.Chart({{chart: {{renderTo: 'chartMainContent_PieChartFonDagilim'}}, series: [{{type: 'pie', name: 'Oran', data: [{pie}], showInLegend: true}}]}});
+//]]>
+</script>
+</form>
+</body></html>"""
+
+    def get_price_history(self, start_date: date, end_date: date) -> dict:
+        start = int(np.searchsorted(self.dates, np.datetime64(start_date, "D"), side="left"))
+        stop = int(np.searchsorted(self.dates, np.datetime64(end_date, "D"), side="right"))
+
+        rows = [
+            {
+                "TARIH": str(timestamp),
+                "FONKODU": code,
+                "FONUNVAN": self.fund_names[code],
+                "FIYAT": value,
+            }
+            for code in self.fund_codes
+            for timestamp, value in zip(self.timestamps[start:stop].tolist(), self._get_prices(code)[start:stop].tolist())
+        ]
+
+        records_total = len(rows)
+        if self.max_records is not None:
+            rows = rows[:self.max_records]
+        return {"draw": 0, "recordsTotal": records_total, "recordsFiltered": records_total, "data": rows}
+
+    def _get_prices(self, code: str) -> np.ndarray:
+        prices = self.prices.get(code, None)
+        if prices is None:
+            rnd = self._get_random(code, "prices")
+            returns = rnd.normal(0.0004, 0.01, size=len(self.dates))
+            prices = np.round(rnd.uniform(1, 50) * np.exp(np.cumsum(returns)), 6)
+            self.prices[code] = prices
+        return prices
+
+    def _get_period_start_date(self, requester: FundFetcher.FundRequester) -> date:
+        # Kept apart from FundRequester.get_start_date, which it checks the trimming of delta crawls against
+        if requester == FundFetcher.FundRequester.YEAR_START:
+            return date(self.today.year, 1, 1)
+
+        amount, unit = {
+            FundFetcher.FundRequester.WEEK_1: (1, "weeks"),
+            FundFetcher.FundRequester.MONTH_1: (1, "months"),
+            FundFetcher.FundRequester.MONTH_3: (3, "months"),
+            FundFetcher.FundRequester.MONTH_6: (6, "months"),
+            FundFetcher.FundRequester.YEAR_1: (1, "years"),
+            FundFetcher.FundRequester.YEAR_3: (3, "years"),
+            FundFetcher.FundRequester.YEAR_5: (5, "years"),
+        }[requester]
+        return self.today - relativedelta(**{unit: amount})
+
+    def _get_view_state(self, code: str, period: str) -> str:
+        return f"{self.seed:x}{code}{period}".encode("utf-8").hex()
+
+    def _get_random(self, code: str, purpose: str = "details") -> np.random.RandomState:
+        digest = sum((i + 1) * ord(c) for i, c in enumerate(f"{purpose}:{code}"))
+        return np.random.RandomState((self.seed * 1_000_003 + digest) % (2 ** 32))
+
+    @staticmethod
+    def _get_letters(index: int, length: int) -> str:
+        letters = []
+        for _ in range(length):
+            index, remainder = divmod(index, len(string.ascii_uppercase))
+            letters.append(string.ascii_uppercase[remainder])
+        return "".join(reversed(letters))
+
+    def _check_validity(self) -> bool:
+        if not isinstance(self.fund_count, int) or self.fund_count <= 0:
+            raise ValueError("Fund count must be a positive integer.")
+        if self.fund_count > len(string.ascii_uppercase) ** self.FUND_CODE_LENGTH:
+            raise ValueError("Fund count exceeds the number of possible fund codes.")
+        if not isinstance(self.founder_count, int) or not 0 < self.founder_count <= len(string.ascii_uppercase) ** 2:
+            raise ValueError("Founder count must be a positive integer.")
+        if not isinstance(self.history_years, int) or self.history_years <= 0:
+            raise ValueError("History length must be a positive number of years.")
+        if self.max_records is not None and self.max_records <= 0:
+            raise ValueError("Maximum number of records must be a positive integer.")
+        return True
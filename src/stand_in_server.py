@@ -0,0 +1,151 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import argparse
+import logging
+from pathlib import Path
+
+from stand_in import StandInServer, SyntheticTEFAS
+from tefas_requests import FixtureStore
+from utils import DateUtils
+
+
+# Configurations
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+    handlers=[
+        logging.StreamHandler()
+    ]
+)
+
+
+class StandIn:
+    def __init__(self):
+        self.args = self.parse_args()
+        self._parse_args()
+
+    def parse_args(self):
+        parser = argparse.ArgumentParser(description="TEFAS Stand-in Server")
+        parser.add_argument(
+            "--host", type=str, default="127.0.0.1",
+            help="Host to listen on. (default: '127.0.0.1')"
+        )
+        parser.add_argument(
+            "--port", type=int, default=8765,
+            help="Port to listen on. (default: 8765)"
+        )
+        parser.add_argument(
+            "--replay", type=str,
+            help="Fixture directory recorded with 'main.py --record-fixtures' to serve responses from."
+        )
+        parser.add_argument(
+            "--synthetic", action="store_true",
+            help="Serve synthetic data, also for requests missing from the replayed fixtures."
+        )
+        parser.add_argument(
+            "--funds", type=int, default=100,
+            help="Number of synthetic funds. (default: 100)"
+        )
+        parser.add_argument(
+            "--founders", type=int,
+            help="Number of synthetic founders. (default: one per 25 funds)"
+        )
+        parser.add_argument(
+            "--years", type=int, default=5,
+            help="Years of synthetic price history. (default: 5)"
+        )
+        parser.add_argument(
+            "--today", type=str,
+            help="Last day of the synthetic price history as 'dd.mm.yyyy'. (default: today)"
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Seed of the synthetic data, errors and latency. (default: 0)"
+        )
+        parser.add_argument(
+            "--max-records", type=int,
+            help="Maximum number of records in a price history response, to exercise truncation."
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.0,
+            help="Added latency of every response in seconds. (default: 0)"
+        )
+        parser.add_argument(
+            "--jitter", type=float, default=0.0,
+            help="Random variation of the latency in seconds. (default: 0)"
+        )
+        parser.add_argument(
+            "--error-rate", type=float, default=0.0,
+            help="Ratio of requests answered with a server error. (default: 0)"
+        )
+        parser.add_argument(
+            "--rate-limit", type=float,
+            help="Requests per second above which requests are answered with 429."
+        )
+        return parser.parse_args()
+
+    def run(self):
+        synthetic = None
+        if self.args.synthetic or not self.args.replay:
+            synthetic = SyntheticTEFAS(
+                fund_count=self.args.funds,
+                founder_count=self.args.founders,
+                history_years=self.args.years,
+                today=DateUtils.parse_date(self.args.today) if self.args.today else None,
+                seed=self.args.seed,
+                max_records=self.args.max_records,
+            )
+
+        server = StandInServer(
+            host=self.args.host,
+            port=self.args.port,
+            synthetic=synthetic,
+            fixture_store=FixtureStore(Path(self.args.replay)) if self.args.replay else None,
+            latency=self.args.latency,
+            jitter=self.args.jitter,
+            error_rate=self.args.error_rate,
+            rate_limit=self.args.rate_limit,
+            seed=self.args.seed,
+        )
+
+        logging.info(
+            f"Serving {'fixtures from ' + self.args.replay if self.args.replay else 'synthetic data'} "
+            f"at {server.get_base_url()}, point the exporter at it with '--base-url {server.get_base_url()}'"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stats = server.get_stats()
+            logging.info(
+                f"Served {stats['requests']} requests: {stats['errors']} errors, "
+                f"{stats['throttled']} throttled, {stats['not_found']} not found"
+            )
+
+    def _parse_args(self):
+        if self.args.replay and not Path(self.args.replay).is_dir():
+            raise ValueError("Fixture directory specified does not exist.")
+        if self.args.port < 0:
+            raise ValueError("Port cannot be negative.")
+
+
+if __name__ == '__main__':
+    StandIn().run()
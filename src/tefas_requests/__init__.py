@@ -17,10 +17,31 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+from .async_tefas_requester import AsyncTEFASRequester
+from .concurrency_controller import ConcurrencyController
+from .fixture_store import FixtureStore
 from .founder_fetcher import FounderFetcher
 from .fund_fetcher import FundFetcher
 from .fund_code_fetcher import FundCodeFetcher
+from .postback_state import PostbackState
+from .rate_limiter import RateLimiter
+from .response_cache import ResponseCache
+from .session_pool import SessionPool
+from .tefas_requester import TEFASRequester
 from .updated_prices_fetcher import UpdatedPricesFetcher
 
 
-__all__ = ["FounderFetcher", "FundFetcher", "FundCodeFetcher", "UpdatedPricesFetcher"]
+__all__ = [
+    "AsyncTEFASRequester",
+    "ConcurrencyController",
+    "FixtureStore",
+    "FounderFetcher",
+    "FundFetcher",
+    "FundCodeFetcher",
+    "PostbackState",
+    "RateLimiter",
+    "ResponseCache",
+    "SessionPool",
+    "TEFASRequester",
+    "UpdatedPricesFetcher",
+]
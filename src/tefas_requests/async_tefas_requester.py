@@ -0,0 +1,170 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import aiohttp
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+from .tefas_requester import TEFASRequester
+from utils import Profiler
+
+
+class AsyncTEFASRequester:
+    def __init__(self, max_concurrency: int = 16):
+        self.max_concurrency = max_concurrency
+        self._check_validity()
+
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncTEFASRequester":
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.session = aiohttp.ClientSession(
+            headers=TEFASRequester.BASE_HEADERS,
+            connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+            # Cookies are passed explicitly within a postback flow,
+            # so concurrent flows never see each other's session cookies.
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.session.close()
+        self.session = None
+        self.semaphore = None
+
+    async def get_request(self, url_endpoint: str, headers: dict = {}, *args, **kwargs) -> str:
+        return await self._cached_request(
+            "GET", url_endpoint, None,
+            lambda: self._request_text("GET", url_endpoint, headers=headers, *args, **kwargs),
+        )
+
+    async def post_request(self, url_endpoint: str, headers: dict = {}, data: dict = {}, *args, **kwargs) -> str:
+        return await self._cached_request(
+            "POST", url_endpoint, data,
+            lambda: self._request_text("POST", url_endpoint, headers=headers, data=data, *args, **kwargs),
+        )
+
+    async def postback_request(self, url_endpoint: str, headers: dict = {}, form_data: dict = {}, *args, **kwargs) -> str:
+        return await self._cached_request(
+            "POSTBACK", url_endpoint, form_data,
+            lambda: self._postback_request(url_endpoint, headers=headers, form_data=form_data, *args, **kwargs),
+        )
+
+    async def _postback_request(self, url_endpoint: str, headers: dict = {}, form_data: dict = {}, *args, **kwargs) -> str:
+        html, cookies = await self._request("GET", url_endpoint, headers=headers, *args, **kwargs)
+
+        data = TEFASRequester.get_postback_form_data(html)
+        form_data = {**data, **form_data}
+
+        text, _ = await self._request(
+            "POST", url_endpoint, headers=headers, data=form_data, cookies=cookies, *args, **kwargs,
+        )
+        return text
+
+    async def _cached_request(
+        self,
+        method: str,
+        url_endpoint: str,
+        data: Optional[dict],
+        send: Callable[[], Awaitable[str]],
+    ) -> str:
+        # Shares the cache of the blocking requester
+        cache = TEFASRequester.response_cache
+        if cache is None or not cache.is_cacheable(url_endpoint):
+            return await send()
+
+        cached = cache.get(method, url_endpoint, data, base_url=TEFASRequester.BASE_URL)
+        if cached is not None:
+            content, encoding = cached
+            return content.decode(encoding or "utf-8")
+
+        text = await send()
+        cache.put(method, url_endpoint, data, text.encode("utf-8"), "utf-8", base_url=TEFASRequester.BASE_URL)
+        return text
+
+    async def _request_text(self, *args, **kwargs) -> str:
+        text, _ = await self._request(*args, **kwargs)
+        return text
+
+    async def _request(
+        self,
+        method: str,
+        url_endpoint: str,
+        headers: dict = {},
+        data: Optional[dict] = None,
+        cookies: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[str, dict]:
+        url = f"{TEFASRequester.BASE_URL}/{url_endpoint}"
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+        for attempt in range(TEFASRequester.RETRIES):
+            delay = TEFASRequester.rate_limiter.reserve(url_endpoint)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            retry_after = None
+
+            try:
+                async with self.semaphore, TEFASRequester.concurrency_controller.slot_async() as slot:
+                    started_at = time.perf_counter()
+                    try:
+                        async with self.session.request(
+                            method, url,
+                            headers=headers, data=data, cookies=cookies, timeout=client_timeout,
+                        ) as response:
+                            if TEFASRequester.is_congested(response.status):
+                                slot.congest()
+                                retry_after = response.headers.get("Retry-After", None)
+                            if not response.ok:
+                                Profiler.get_default().record_latency(
+                                    url_endpoint, time.perf_counter() - started_at, response.status,
+                                )
+                            response.raise_for_status()
+                            content = await response.read()
+                            Profiler.get_default().record_latency(
+                                url_endpoint, time.perf_counter() - started_at, response.status,
+                            )
+                            text = content.decode(response.get_encoding())
+                            response_cookies = {key: morsel.value for key, morsel in response.cookies.items()}
+                            slot.succeed()
+
+                            if TEFASRequester.fixture_store is not None:
+                                TEFASRequester.fixture_store.record(
+                                    method, url_endpoint, data,
+                                    response.status, response.headers.get("Content-Type", None), content,
+                                )
+                            return text, response_cookies
+                    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                        Profiler.get_default().record_latency(url_endpoint, time.perf_counter() - started_at)
+                        slot.congest()
+                        raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < TEFASRequester.RETRIES - 1:
+                    await asyncio.sleep(TEFASRequester.get_backoff_delay(attempt, retry_after))
+                else:
+                    raise e
+
+    def _check_validity(self) -> bool:
+        if not isinstance(self.max_concurrency, int):
+            raise ValueError("Maximum concurrency must be an integer.")
+        if self.max_concurrency <= 0:
+            raise ValueError("Maximum concurrency must be a positive integer.")
+        return True
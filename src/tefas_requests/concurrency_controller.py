@@ -0,0 +1,189 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+
+class ConcurrencyController:
+    # Limit on the number of requests in flight, fixed at max_limit by default.
+    # Adaptive limits follow AIMD: the limit grows by one after a full window
+    # of healthy responses and is halved on throttling, server errors and timeouts.
+    DECREASE_FACTOR = 0.5
+    LATENCY_TOLERANCE = 2.0
+    LATENCY_SMOOTHING = 0.2
+
+
+    def __init__(self, max_limit: int = 16, min_limit: int = 1, initial_limit: Optional[int] = None, adaptive: bool = False):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.adaptive = adaptive
+        if initial_limit is None:
+            initial_limit = max(min_limit, max_limit // 2) if adaptive else max_limit
+        self.limit = initial_limit
+        self._check_validity()
+
+        self.condition = threading.Condition()
+        # Coroutines wait on a condition of their own event loop
+        self.async_condition: Optional[asyncio.Condition] = None
+        self.async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+        self.successes = 0
+        self.latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self.decreased_at = 0.0
+        self.stats = {
+            "increases": 0,
+            "decreases": 0,
+        }
+
+    def get_limit(self) -> int:
+        return self.limit
+
+    def get_in_flight(self) -> int:
+        return self.in_flight
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.condition:
+            return {"limit": self.limit, "in_flight": self.in_flight, **self.stats}
+
+    @contextmanager
+    def slot(self) -> Iterator["ConcurrencyController.Slot"]:
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+            self.in_flight += 1
+
+        slot = ConcurrencyController.Slot()
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+            self._notify_async_threadsafe()
+
+    @asynccontextmanager
+    async def slot_async(self) -> AsyncIterator["ConcurrencyController.Slot"]:
+        # The event loop must not block on the threading condition,
+        # coroutines are woken up by every release instead.
+        condition = self._get_async_condition()
+        async with condition:
+            await condition.wait_for(self._try_acquire)
+
+        slot = ConcurrencyController.Slot()
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+            await self._notify_async(condition)
+
+    def _get_async_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self.async_loop is not loop:
+            self.async_condition = asyncio.Condition()
+            self.async_loop = loop
+        return self.async_condition
+
+    @staticmethod
+    async def _notify_async(condition: asyncio.Condition) -> None:
+        async with condition:
+            condition.notify_all()
+
+    def _notify_async_threadsafe(self) -> None:
+        # Slots released by threads wake up the coroutines of a running event loop too
+        condition, loop = self.async_condition, self.async_loop
+        if condition is None or not loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self._notify_async(condition), loop)
+
+    def _try_acquire(self) -> bool:
+        with self.condition:
+            if self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def _release(self, slot: "ConcurrencyController.Slot") -> None:
+        latency = time.monotonic() - slot.started_at
+
+        with self.condition:
+            self.in_flight -= 1
+            if self.adaptive:
+                if slot.congested:
+                    self._decrease()
+                elif slot.succeeded:
+                    self._on_success(latency)
+            self.condition.notify_all()
+
+    def _on_success(self, latency: float) -> None:
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self.LATENCY_SMOOTHING * (latency - self.latency)
+        if self.baseline_latency is None or self.latency < self.baseline_latency:
+            self.baseline_latency = self.latency
+
+        # Slow responses hold the limit where it is
+        if self.latency > self.baseline_latency * self.LATENCY_TOLERANCE:
+            self.successes = 0
+            return
+
+        self.successes += 1
+        if self.successes >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+            self.successes = 0
+            self.stats["increases"] += 1
+
+    def _decrease(self) -> None:
+        # Requests that were already in flight when the limit dropped report
+        # the same congestion, so the limit is cut at most once per latency.
+        now = time.monotonic()
+        if self.latency is not None and now - self.decreased_at < self.latency:
+            return
+
+        self.limit = max(self.min_limit, int(self.limit * self.DECREASE_FACTOR))
+        self.successes = 0
+        self.decreased_at = now
+        self.stats["decreases"] += 1
+
+    def _check_validity(self) -> bool:
+        if not isinstance(self.max_limit, int) or not isinstance(self.min_limit, int):
+            raise ValueError("Concurrency limits must be integers.")
+        if self.min_limit <= 0:
+            raise ValueError("Minimum concurrency must be a positive integer.")
+        if self.max_limit < self.min_limit:
+            raise ValueError("Maximum concurrency cannot be less than the minimum.")
+        if not self.min_limit <= self.limit <= self.max_limit:
+            raise ValueError("Initial concurrency must be between the minimum and the maximum.")
+        return True
+
+
+    class Slot:
+        def __init__(self):
+            self.started_at = time.monotonic()
+            self.succeeded = False
+            self.congested = False
+
+        def succeed(self) -> None:
+            self.succeeded = True
+
+        def congest(self) -> None:
+            self.congested = True
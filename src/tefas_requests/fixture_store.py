@@ -0,0 +1,100 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+class FixtureStore:
+    INDEX_FILENAME = "index.jsonl"
+    RESPONSES_DIRECTORY = "responses"
+
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._check_validity()
+
+        self.lock = threading.Lock()
+        self.fixtures: Optional[Dict[str, dict]] = None
+
+    def get_directory(self) -> Path:
+        return self.directory
+
+    @staticmethod
+    def get_key(method: str, url_endpoint: str, data: Optional[dict] = None) -> str:
+        # ASP.NET state fields (__VIEWSTATE, __EVENTVALIDATION, ...) differ between
+        # sessions, requests are told apart by the remaining form fields.
+        fields = {key: value for key, value in (data or {}).items() if not key.startswith("__")}
+        key = json.dumps([method.upper(), url_endpoint.lstrip("/"), fields], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def record(
+        self,
+        method: str,
+        url_endpoint: str,
+        data: Optional[dict],
+        status: int,
+        content_type: Optional[str],
+        content: bytes,
+    ) -> None:
+        key = self.get_key(method, url_endpoint, data)
+        entry = {
+            "key": key,
+            "method": method.upper(),
+            "url_endpoint": url_endpoint,
+            "status": status,
+            "content_type": content_type,
+        }
+
+        with self.lock:
+            responses_directory = self.directory / self.RESPONSES_DIRECTORY
+            responses_directory.mkdir(parents=True, exist_ok=True)
+            (responses_directory / key).write_bytes(content)
+            with open(self.directory / self.INDEX_FILENAME, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def load(self) -> Dict[str, dict]:
+        # Later recordings of the same request replace earlier ones
+        fixtures = {}
+        with open(self.directory / self.INDEX_FILENAME, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    fixtures[entry["key"]] = entry
+        self.fixtures = fixtures
+        return fixtures
+
+    def get(self, method: str, url_endpoint: str, data: Optional[dict] = None) -> Optional[Tuple[dict, bytes]]:
+        if self.fixtures is None:
+            self.load()
+
+        entry = self.fixtures.get(self.get_key(method, url_endpoint, data), None)
+        if entry is None:
+            return None
+        return entry, (self.directory / self.RESPONSES_DIRECTORY / entry["key"]).read_bytes()
+
+    def _check_validity(self) -> bool:
+        if not self.directory:
+            raise ValueError("Fixture directory must be specified.")
+        if self.directory.exists() and not self.directory.is_dir():
+            raise ValueError("Fixture directory must be a directory.")
+        return True
@@ -17,10 +17,10 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
-from typing import List, Dict
+from typing import Dict
 
 from .tefas_requester import TEFASRequester
-from data_struct import Founder
+from data_struct import Founder, FounderRegistry
 
 
 class FundCodeFetcher:
@@ -29,13 +29,6 @@ class FundCodeFetcher:
         "fontip": "YAT",
     }
 
-    founders = None
-
-
-    @classmethod
-    def set_founders(cls, founders: List[Founder]) -> None:
-        cls.founders = founders
-
 
     @staticmethod
     def fetch_tefas_fund_codes() -> Dict[str, Founder]:
@@ -52,14 +45,13 @@ class FundCodeFetcher:
         response = TEFASRequester.post_request(FundCodeFetcher.URL_ENDPOINT, data=payload)
         response_data = response.json().get("data", [])
 
+        founder_registry = FounderRegistry.get_default()
         data = {}
         for item in response_data:
             fund_code = item.get("FONKODU", None)
             founder_code = item.get("KURUCUKODU", None)
 
-            founder = next((f for f in FundCodeFetcher.founders if f.get_code() == founder_code), None) \
-                        if founder_code and FundCodeFetcher.founders \
-                        else None
+            founder = founder_registry.get(founder_code)
 
             if fund_code:
                 data.update({fund_code: founder})
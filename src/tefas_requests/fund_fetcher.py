@@ -19,17 +19,21 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import ast
 import re
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from datetime import date
+from dateutil.relativedelta import relativedelta
 from enum import Enum, auto
 from typing import Optional, Union, List
 
+from .async_tefas_requester import AsyncTEFASRequester
 from .tefas_requester import TEFASRequester
-from data_struct import AssetDistribution, Asset, Founder, Price
-from utils import DateUtils
+from data_struct import AssetDistribution, Asset, Founder, FounderRegistry, PriceSeries
+from utils import ArrayUtils
 
 
 class FundFetcher:
     URL_ENDPOINT = "FonAnaliz.aspx?FonKod={code}"
+    TIMEOUT = 20
     BASE_FORM_DATA_TEMPLATE = {
         'ctl00$MainContent$RadioButtonListPeriod': '{value}',
     }
@@ -43,18 +47,104 @@ class FundFetcher:
         "Platform İşlem Durumu": "is_in_tefas",
     }
 
-
-    def __init__(self, code: str, founder: Founder, fund_price_range: Optional[str] = None):
+    # Fast path: only the indicator and profile blocks are parsed into a tree,
+    # chart data is read straight from the script tags of the raw page.
+    FAST_PATH_STRAINER = SoupStrainer('div', class_=['main-indicators', 'fund-profile'])
+    SCRIPT_TAG_PATTERN = re.compile(
+        r"<script\b[^>]*\btype=[\"']text/javascript[\"'][^>]*>.*?</script\s*>",
+        re.DOTALL | re.IGNORECASE,
+    )
+    CHART_DATA_PATTERN = re.compile(
+        r"chartMainContent_FonFiyatGrafik.*?xAxis.*?categories.*?(\[.*?\]).*?series.*?data.*?(\[.*?\])",
+        re.DOTALL,
+    )
+    PIE_CHART_PATTERN = re.compile(
+        r"chartMainContent_PieChartFonDagilim.*?series.*?data.*?(\[.*?\]),[^\]]*?showInLegend",
+        re.DOTALL,
+    )
+    COLUMN_CHART_PATTERN = re.compile(
+        r"chartMainContent_ColumnChartFonDagilim.*?series: (\[\{.*?\}\])",
+        re.DOTALL,
+    )
+
+
+    def __init__(
+        self,
+        code: str,
+        founder: Founder,
+        fund_price_range: Optional[str] = None,
+        html: Optional[str] = None,
+    ):
         self.code = code
-        self.founder = founder
-        self.soup = FundFetcher.FundRequester.get_soup(
+        self.founder = FounderRegistry.get_default().intern(founder)
+
+        if html is None:
+            html = FundFetcher.fetch_html(code, fund_price_range)
+        self.html = html
+
+        self.fast_path = True
+        self.soup: Optional[BeautifulSoup] = None
+        self.scripts: Optional[str] = None
+
+    @staticmethod
+    def fetch_html(code: str, fund_price_range: Optional[str] = None, timeout: Optional[float] = None) -> str:
+        return FundFetcher.FundRequester.get_html(
             FundFetcher.FundRequester.get_fund_requester_type(fund_price_range),
-            self.URL_ENDPOINT.format(code=self.code),
-            timeout=20,
+            FundFetcher.URL_ENDPOINT.format(code=code),
+            timeout=timeout or FundFetcher.TIMEOUT,
         )
 
+    @staticmethod
+    async def fetch_html_async(
+        requester: AsyncTEFASRequester,
+        code: str,
+        fund_price_range: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        return await FundFetcher.FundRequester.get_html_async(
+            requester,
+            FundFetcher.FundRequester.get_fund_requester_type(fund_price_range),
+            FundFetcher.URL_ENDPOINT.format(code=code),
+            timeout=timeout or FundFetcher.TIMEOUT,
+        )
+
+    @staticmethod
+    def parse_fund_data(code: str, founder: Founder, html: str) -> Asset:
+        return FundFetcher(code, founder, html=html).get_fund_data()
+
+    def get_soup(self) -> BeautifulSoup:
+        if self.soup is None:
+            if self.fast_path:
+                self.soup = BeautifulSoup(self._get_fast_path_fragment(), 'html.parser', parse_only=self.FAST_PATH_STRAINER)
+            else:
+                self.soup = BeautifulSoup(self.html, 'html.parser')
+        return self.soup
+
+    def get_scripts(self) -> str:
+        if self.scripts is None:
+            if self.fast_path:
+                self.scripts = "".join(self.SCRIPT_TAG_PATTERN.findall(self.html))
+            else:
+                self.scripts = "".join(str(tag) for tag in self.get_soup().find_all('script', type='text/javascript'))
+        return self.scripts
+
+    def _get_fast_path_fragment(self) -> str:
+        # Narrow the page down to the span holding the indicator and profile blocks,
+        # so the tokenizer does not have to walk the rest of the page.
+        indicators_index = self.html.find('main-indicators')
+        profile_index = self.html.find('MainContent_DetailsViewFund')
+        if indicators_index == -1 or profile_index == -1:
+            return self.html
+
+        start = self.html.rfind('<div', 0, min(indicators_index, profile_index))
+        end = self.html.find('</table>', profile_index)
+        if start == -1 or end == -1 or end < indicators_index:
+            return self.html
+
+        return self.html[start:end] + '</table></div>'
+
     def extract_main_indicators(self) -> dict:
-        main_div = self.soup.find('div', class_='main-indicators')
+        main_div = self.get_soup().find('div', class_='main-indicators')
         if not main_div:
             return {}
 
@@ -80,7 +170,8 @@ class FundFetcher:
         return data
 
     def extract_fund_profile(self) -> dict:
-        profile_table = self.soup.find('div', class_='fund-profile').find('table', id='MainContent_DetailsViewFund')
+        profile_div = self.get_soup().find('div', class_='fund-profile')
+        profile_table = profile_div.find('table', id='MainContent_DetailsViewFund') if profile_div else None
         if not profile_table:
             return {}
 
@@ -102,31 +193,24 @@ class FundFetcher:
 
         return data
 
-    def extract_chart_data(self) -> List[Price]:
-        scripts = "".join(str(tag) for tag in self.soup.find_all('script', type='text/javascript'))
-
-        match = re.search(
-            r"chartMainContent_FonFiyatGrafik.*?xAxis.*?categories.*?(\[.*?\]).*?series.*?data.*?(\[.*?\])",
-            scripts, re.DOTALL
-        )
+    def extract_chart_data(self) -> PriceSeries:
+        match = self.CHART_DATA_PATTERN.search(self.get_scripts())
         if not match:
-            return []
+            return PriceSeries(dates=[], values=[])
 
-        dates = ast.literal_eval(match.group(1))
-        prices = ast.literal_eval(match.group(2))
+        dates = ArrayUtils.decode_date_array(match.group(1))
+        values = ArrayUtils.decode_float_array(match.group(2))
+        if len(dates) != len(values):
+            raise ValueError(f"Chart data has {len(dates)} dates and {len(values)} prices.")
 
-        price_list = [
-            Price(
-                date=DateUtils.parse_date(d),
-                value=p,
-            )
-            for d, p in zip(dates, prices)
-            if p != 0.0
-        ]
-        return price_list
+        non_zero = values != 0.0
+        return PriceSeries(
+            dates=dates[non_zero],
+            values=values[non_zero],
+        )
 
     def extract_asset_distribution(self) -> List[AssetDistribution]:
-        scripts = "".join(str(tag) for tag in self.soup.find_all('script', type='text/javascript'))
+        scripts = self.get_scripts()
 
         match_pie = self.AssetDistributionParser._parse_asset_distribution(scripts, self.AssetDistributionParser.PIE)
         match_column = self.AssetDistributionParser._parse_asset_distribution(scripts, self.AssetDistributionParser.COLUMN)
@@ -157,6 +241,13 @@ class FundFetcher:
         prices = self.extract_chart_data()
         asset_distribution = self.extract_asset_distribution()
 
+        # Fall back to parsing the whole page if the fast path missed anything
+        if self.fast_path and not (main_indicators and fund_profile and prices and asset_distribution):
+            self.fast_path = False
+            self.soup = None
+            self.scripts = None
+            return self.get_fund_data()
+
         market_share = main_indicators.get('market_share', None)
         market_share = market_share / 100 if market_share is not None else None
 
@@ -193,15 +284,44 @@ class FundFetcher:
             except KeyError:
                 raise ValueError(f"'{value}' is not a valid period.")
 
+        def get_start_date(self, today: date) -> date:
+            # First date of the price history a fund page shows for the period
+            if self == FundFetcher.FundRequester.YEAR_START:
+                return date(today.year, 1, 1)
+
+            amount, unit = {
+                FundFetcher.FundRequester.WEEK_1: (1, "weeks"),
+                FundFetcher.FundRequester.MONTH_1: (1, "months"),
+                FundFetcher.FundRequester.MONTH_3: (3, "months"),
+                FundFetcher.FundRequester.MONTH_6: (6, "months"),
+                FundFetcher.FundRequester.YEAR_1: (1, "years"),
+                FundFetcher.FundRequester.YEAR_3: (3, "years"),
+                FundFetcher.FundRequester.YEAR_5: (5, "years"),
+            }[self]
+            return today - relativedelta(**{unit: amount})
+
         @staticmethod
-        def get_soup(request_range: "FundFetcher.FundRequester", url_endpoint: str, *args, **kwargs) -> BeautifulSoup:
+        def get_html(request_range: "FundFetcher.FundRequester", url_endpoint: str, *args, **kwargs) -> str:
             if request_range == FundFetcher.FundRequester.YEAR_1:
                 response = TEFASRequester.get_request(url_endpoint, *args, **kwargs)
             else:
                 form_data = FundFetcher.FundRequester._format_form_data(request_range)
                 response = TEFASRequester.postback_request(url_endpoint, form_data=form_data, *args, **kwargs)
 
-            return TEFASRequester.get_soup(response)
+            return response.text
+
+        @staticmethod
+        async def get_html_async(
+            requester: AsyncTEFASRequester,
+            request_range: "FundFetcher.FundRequester",
+            url_endpoint: str,
+            *args, **kwargs,
+        ) -> str:
+            if request_range == FundFetcher.FundRequester.YEAR_1:
+                return await requester.get_request(url_endpoint, *args, **kwargs)
+
+            form_data = FundFetcher.FundRequester._format_form_data(request_range)
+            return await requester.postback_request(url_endpoint, form_data=form_data, *args, **kwargs)
 
         @staticmethod
         def _format_form_data(request_range: "FundFetcher.FundRequester") -> dict:
@@ -265,10 +385,7 @@ class FundFetcher:
 
         @staticmethod
         def __asset_distribution_pie_regex(string: str) -> Optional[List]:
-            match = re.search(
-                r"chartMainContent_PieChartFonDagilim.*?series.*?data.*?(\[.*?\]),[^\]]*?showInLegend",
-                string, re.DOTALL,
-            )
+            match = FundFetcher.PIE_CHART_PATTERN.search(string)
             if not match:
                 return None
 
@@ -277,10 +394,7 @@ class FundFetcher:
 
         @staticmethod
         def __asset_distribution_column_regex(string: str) -> Optional[List]:
-            match = re.search(
-                r"chartMainContent_ColumnChartFonDagilim.*?series: (\[\{.*?\}\])",
-                string, re.DOTALL,
-            )
+            match = FundFetcher.COLUMN_CHART_PATTERN.search(string)
             if not match:
                 return None
 
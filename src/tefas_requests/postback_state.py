@@ -0,0 +1,66 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import html as html_lib
+import re
+from typing import Dict
+
+
+class PostbackState:
+    # Lightweight scanner for the form fields of an ASP.NET page,
+    # the rest of the page is never parsed into a tree.
+    IGNORED_BLOCK_PATTERN = re.compile(r"<script\b.*?</script\s*>|<!--.*?-->", re.DOTALL | re.IGNORECASE)
+    INPUT_TAG_PATTERN = re.compile(r"<input\b([^>]*)>", re.IGNORECASE)
+    SELECT_TAG_PATTERN = re.compile(r"<select\b([^>]*)>(.*?)</select\s*>", re.DOTALL | re.IGNORECASE)
+    OPTION_TAG_PATTERN = re.compile(r"<option\b([^>]*)>", re.IGNORECASE)
+    ATTRIBUTE_PATTERN = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+)))?""")
+
+
+    @staticmethod
+    def scan_form_data(html: str) -> dict:
+        html = PostbackState.IGNORED_BLOCK_PATTERN.sub("", html)
+        data = {}
+
+        for match in PostbackState.INPUT_TAG_PATTERN.finditer(html):
+            attributes = PostbackState._parse_attributes(match.group(1))
+            name = attributes.get("name", None)
+            if name:
+                data[name] = attributes.get("value", "")
+
+        for match in PostbackState.SELECT_TAG_PATTERN.finditer(html):
+            name = PostbackState._parse_attributes(match.group(1)).get("name", None)
+            if not name:
+                continue
+
+            for option in PostbackState.OPTION_TAG_PATTERN.finditer(match.group(2)):
+                attributes = PostbackState._parse_attributes(option.group(1))
+                if "selected" in attributes:
+                    data[name] = attributes.get("value", "")
+                    break
+
+        return data
+
+    @staticmethod
+    def _parse_attributes(tag: str) -> Dict[str, str]:
+        attributes = {}
+        for match in PostbackState.ATTRIBUTE_PATTERN.finditer(tag):
+            name = match.group(1).lower()
+            value = next((group for group in match.groups()[1:] if group is not None), "")
+            attributes.setdefault(name, html_lib.unescape(value))
+        return attributes
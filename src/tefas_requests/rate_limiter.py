@@ -0,0 +1,126 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class RateLimiter:
+    # Requests per second and burst size of each endpoint when throttling is enabled,
+    # a limiter created without any limits lets every request through.
+    DEFAULT_LIMITS = {
+        "FonAnaliz.aspx": (20.0, 40),
+        "api/DB/BindHistoryInfo": (10.0, 20),
+    }
+    DEFAULT_LIMIT = (10.0, 10)
+
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None, default_limit: Optional[Tuple[float, int]] = None):
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self._check_validity()
+
+        self.lock = threading.Lock()
+        self.buckets: Dict[str, "RateLimiter.TokenBucket"] = {}
+
+    @classmethod
+    def create_default(
+        cls,
+        limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        default_limit: Optional[Tuple[float, int]] = None,
+    ) -> "RateLimiter":
+        # The default limits, overridden by the given ones
+        return cls(limits={**cls.DEFAULT_LIMITS, **(limits or {})}, default_limit=default_limit or cls.DEFAULT_LIMIT)
+
+    def get_limit(self, url_endpoint: str) -> Optional[Tuple[float, int]]:
+        return self.limits.get(self._get_key(url_endpoint), self.default_limit)
+
+    def reserve(self, url_endpoint: str) -> float:
+        # Takes a token for the endpoint and returns how long to wait before sending
+        key = self._get_key(url_endpoint)
+        limit = self.limits.get(key, self.default_limit)
+        if limit is None:
+            return 0.0
+
+        with self.lock:
+            bucket = self.buckets.get(key, None)
+            if bucket is None:
+                bucket = RateLimiter.TokenBucket(*limit)
+                self.buckets[key] = bucket
+            return bucket.reserve()
+
+    def wait(self, url_endpoint: str) -> None:
+        delay = self.reserve(url_endpoint)
+        if delay > 0:
+            time.sleep(delay)
+
+    @staticmethod
+    def parse_limit(value: str) -> Tuple[str, Tuple[float, int]]:
+        # "<endpoint>=<rate>[:<burst>]"
+        try:
+            endpoint, limit = value.split("=", 1)
+            rate, _, burst = limit.partition(":")
+            rate = float(rate)
+            burst = int(burst) if burst else max(int(rate), 1)
+        except ValueError:
+            raise ValueError(f"'{value}' is not a valid rate limit.")
+        return endpoint, (rate, burst)
+
+    @staticmethod
+    def _get_key(url_endpoint: str) -> str:
+        return url_endpoint.split("?", 1)[0]
+
+    def _check_validity(self) -> bool:
+        limits = [*self.limits.values(), *([self.default_limit] if self.default_limit is not None else [])]
+        for rate, burst in limits:
+            if rate <= 0:
+                raise ValueError("Rate limit must be a positive number of requests per second.")
+            if not isinstance(burst, int) or burst <= 0:
+                raise ValueError("Burst size must be a positive integer.")
+        return True
+
+
+    class TokenBucket:
+        def __init__(self, rate: float, burst: int):
+            self.rate = rate
+            self.burst = burst
+            self.tokens = float(burst)
+            self.updated_at = time.monotonic()
+
+        def reserve(self) -> float:
+            # Tokens may go negative, the debt is the waiting time of the caller.
+            # Not thread-safe on its own, the RateLimiter lock guards it.
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+        def try_take(self) -> bool:
+            self._refill()
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+        def _refill(self) -> None:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
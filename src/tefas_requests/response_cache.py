@@ -0,0 +1,226 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from data_struct import TradingCalendar
+
+
+class ResponseCache:
+    # Responses of these endpoints only change once a day
+    TTLS = {
+        "FonKarsilastirma.aspx": timedelta(days=1),
+        "api/DB/BindComparisonManagementFees": timedelta(days=1),
+    }
+    # Responses of these endpoints change with the prices, at the market close
+    MARKET_CLOSE_ENDPOINTS = (
+        "FonAnaliz.aspx",
+        "api/DB/BindHistoryInfo",
+    )
+    MARKET_CLOSE = dt_time(18, 0)
+    MARKET_TIMEZONE = timezone(timedelta(hours=3))
+    EVICTION_RATIO = 0.9
+    ENTRY_SUFFIX = ".entry"
+
+
+    def __init__(self, directory: Path, max_size: int = 512 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._check_validity()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.size = sum(size for _, size, _ in self._scan_entries())
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.stats)
+
+    def is_cacheable(self, url_endpoint: str) -> bool:
+        return self._get_expiry(url_endpoint) is not None
+
+    def get(
+        self,
+        method: str,
+        url_endpoint: str,
+        data: Optional[dict] = None,
+        base_url: str = "",
+    ) -> Optional[Tuple[bytes, Optional[str]]]:
+        if not self.is_cacheable(url_endpoint):
+            return None
+
+        path = self._get_entry_path(method, url_endpoint, data, base_url)
+        try:
+            with open(path, "rb") as f:
+                header, content = f.read().split(b"\n", 1)
+            header = json.loads(header)
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+
+        if header.get("expires_at", 0) <= time.time():
+            self._remove(path)
+            self._count("expired")
+            self._count("misses")
+            return None
+
+        # The modification time orders the entries for eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        self._count("hits")
+        return content, header.get("encoding", None)
+
+    def put(
+        self,
+        method: str,
+        url_endpoint: str,
+        data: Optional[dict],
+        content: bytes,
+        encoding: Optional[str] = None,
+        base_url: str = "",
+    ) -> None:
+        expires_at = self._get_expiry(url_endpoint)
+        if expires_at is None:
+            return
+
+        header = json.dumps({
+            "base_url": base_url,
+            "url_endpoint": url_endpoint,
+            "expires_at": expires_at,
+            "encoding": encoding,
+        }).encode("utf-8")
+
+        # Written to a temporary file and renamed, so concurrent readers
+        # and writers of the same entry never see a partial file.
+        path = self._get_entry_path(method, url_endpoint, data, base_url)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header + b"\n" + content)
+            os.replace(temp_path, path)
+        except OSError:
+            self._remove(Path(temp_path))
+            return
+
+        with self.lock:
+            self.stats["writes"] += 1
+            self.size += len(header) + 1 + len(content)
+            if self.size > self.max_size:
+                self._evict()
+
+    def clear(self) -> None:
+        with self.lock:
+            for path, _, _ in self._scan_entries():
+                self._remove(path)
+            self.size = 0
+
+    def _get_expiry(self, url_endpoint: str) -> Optional[float]:
+        endpoint = url_endpoint.split("?", 1)[0]
+
+        ttl = self.TTLS.get(endpoint, None)
+        if ttl is not None:
+            return time.time() + ttl.total_seconds()
+
+        if endpoint in self.MARKET_CLOSE_ENDPOINTS:
+            return self._get_next_market_close().timestamp()
+
+        return None
+
+    def _get_next_market_close(self) -> datetime:
+        now = datetime.now(self.MARKET_TIMEZONE)
+        day = now.date() if now.time() < self.MARKET_CLOSE else now.date() + timedelta(days=1)
+        day = TradingCalendar.get_default().get_next_trading_day(day)
+        return datetime.combine(day, self.MARKET_CLOSE, tzinfo=self.MARKET_TIMEZONE)
+
+    def _get_entry_path(self, method: str, url_endpoint: str, data: Optional[dict], base_url: str = "") -> Path:
+        # Responses of different servers, e.g. a stand-in and the live website, never mix
+        key = json.dumps(
+            [base_url.rstrip("/"), method.upper(), url_endpoint, data or {}], sort_keys=True, ensure_ascii=False,
+        )
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{self.ENTRY_SUFFIX}"
+
+    def _scan_entries(self) -> List[Tuple[Path, int, float]]:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((Path(entry.path), stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self) -> None:
+        # Least recently used entries go first, until the cache is
+        # comfortably below its size limit. Called with the lock held.
+        entries = sorted(self._scan_entries(), key=lambda entry: entry[2])
+        size = sum(entry_size for _, entry_size, _ in entries)
+
+        for path, entry_size, _ in entries:
+            if size <= self.max_size * self.EVICTION_RATIO:
+                break
+            if self._remove(path):
+                size -= entry_size
+                self.stats["evictions"] += 1
+
+        self.size = size
+
+    def _count(self, key: str) -> None:
+        with self.lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _remove(path: Path) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def _check_validity(self) -> bool:
+        if not self.directory:
+            raise ValueError("Cache directory must be specified.")
+        if self.directory.exists() and not self.directory.is_dir():
+            raise ValueError("Cache directory must be a directory.")
+        if not isinstance(self.max_size, int):
+            raise ValueError("Maximum cache size must be an integer.")
+        if self.max_size <= 0:
+            raise ValueError("Maximum cache size must be a positive integer.")
+        return True
@@ -0,0 +1,97 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import queue
+import requests
+from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterator, Optional
+
+
+class SessionPool:
+    def __init__(self, pool_size: int = 16, headers: Optional[dict] = None):
+        self.pool_size = pool_size
+        self.headers = headers or {}
+        self._check_validity()
+
+        # All sessions share one adapter, so keep-alive connections are pooled
+        # across every fetcher while each session keeps its own cookie jar.
+        self.adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+        )
+        self.sessions: queue.LifoQueue = queue.LifoQueue()
+
+    def get_pool_size(self) -> int:
+        return self.pool_size
+
+    @contextmanager
+    def session(self) -> Iterator[requests.Session]:
+        try:
+            session = self.sessions.get_nowait()
+        except queue.Empty:
+            session = self._create_session()
+
+        # Cookies belong to a single request flow (e.g. ASP.NET postbacks),
+        # connections are the only state shared between flows.
+        session.cookies.clear()
+        try:
+            yield session
+        finally:
+            self.sessions.put(session)
+
+    def get_stats(self) -> Dict[str, int]:
+        new_connections = 0
+        requests_sent = 0
+
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            new_connections += pool.num_connections
+            requests_sent += pool.num_requests
+
+        return {
+            "requests": requests_sent,
+            "new_connections": new_connections,
+            "reused_connections": max(requests_sent - new_connections, 0),
+        }
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.sessions.get_nowait()
+            except queue.Empty:
+                break
+        self.adapter.close()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        session.mount("https://", self.adapter)
+        session.mount("http://", self.adapter)
+        session.headers.update(self.headers)
+        return session
+
+    def _check_validity(self) -> bool:
+        if not isinstance(self.pool_size, int):
+            raise ValueError("Pool size must be an integer.")
+        if self.pool_size <= 0:
+            raise ValueError("Pool size must be a positive integer.")
+        return True
@@ -17,11 +17,20 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+import random
 import time
 import requests
 import urllib.parse
 from bs4 import BeautifulSoup
-from typing import Optional
+from typing import Callable, Dict, Optional
+
+from .concurrency_controller import ConcurrencyController
+from .fixture_store import FixtureStore
+from .postback_state import PostbackState
+from .rate_limiter import RateLimiter
+from .response_cache import ResponseCache
+from .session_pool import SessionPool
+from utils import Profiler
 
 
 class TEFASRequester:
@@ -32,6 +41,86 @@ class TEFASRequester:
     }
     RETRIES = 5
     DELAY = 0.5
+    MAX_DELAY = 10.0
+    MAX_RETRY_AFTER = 60.0
+    TOO_MANY_REQUESTS = 429
+
+    session_pool = SessionPool(headers=BASE_HEADERS)
+    response_cache: Optional[ResponseCache] = None
+    rate_limiter = RateLimiter()
+    concurrency_controller = ConcurrencyController()
+    fixture_store: Optional[FixtureStore] = None
+
+
+    @classmethod
+    def set_base_url(cls, base_url: str) -> None:
+        # The host header follows the base URL, so the sessions are recreated
+        cls.BASE_URL = base_url.rstrip("/")
+        cls.BASE_HEADERS = {**cls.BASE_HEADERS, "host": urllib.parse.urlsplit(cls.BASE_URL).netloc}
+
+        old_pool = cls.session_pool
+        cls.session_pool = SessionPool(pool_size=old_pool.get_pool_size(), headers=cls.BASE_HEADERS)
+        old_pool.close()
+
+    @classmethod
+    def set_fixture_store(cls, fixture_store: Optional[FixtureStore]) -> None:
+        cls.fixture_store = fixture_store
+
+    @classmethod
+    def set_pool_size(cls, pool_size: int) -> None:
+        if pool_size == cls.session_pool.get_pool_size():
+            return
+
+        old_pool = cls.session_pool
+        cls.session_pool = SessionPool(pool_size=pool_size, headers=cls.BASE_HEADERS)
+        old_pool.close()
+
+    @classmethod
+    def set_rate_limiter(cls, rate_limiter: RateLimiter) -> None:
+        cls.rate_limiter = rate_limiter
+
+    @classmethod
+    def set_concurrency_controller(cls, concurrency_controller: ConcurrencyController) -> None:
+        cls.concurrency_controller = concurrency_controller
+
+    @classmethod
+    def get_progress_postfix(cls) -> Dict[str, str]:
+        stats = cls.concurrency_controller.get_stats()
+        return {
+            "concurrency": f"{stats['limit']}/{cls.concurrency_controller.max_limit}",
+            "throttled": str(stats["decreases"]),
+        }
+
+    @staticmethod
+    def is_congested(status_code: int) -> bool:
+        return status_code == TEFASRequester.TOO_MANY_REQUESTS or status_code >= 500
+
+    @staticmethod
+    def get_backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+        # Exponential backoff with equal jitter, so retries of requests that
+        # failed together do not hit the server together again.
+        delay = min(TEFASRequester.MAX_DELAY, TEFASRequester.DELAY * 2 ** attempt)
+        delay = delay / 2 + random.uniform(0, delay / 2)
+
+        # Retry-After of the server is followed, up to a maximum
+        try:
+            return min(max(delay, float(retry_after)), TEFASRequester.MAX_RETRY_AFTER) if retry_after else delay
+        except ValueError:
+            return delay
+
+    @classmethod
+    def set_response_cache(cls, response_cache: Optional[ResponseCache]) -> None:
+        cls.response_cache = response_cache
+
+    @classmethod
+    def get_cache_stats(cls) -> Optional[Dict[str, int]]:
+        if cls.response_cache is None:
+            return None
+        return cls.response_cache.get_stats()
+
+    @classmethod
+    def get_connection_stats(cls) -> Dict[str, int]:
+        return cls.session_pool.get_stats()
 
     @staticmethod
     def get_soup(response: requests.Response) -> BeautifulSoup:
@@ -39,51 +128,77 @@ class TEFASRequester:
 
     @staticmethod
     def get_request(url_endpoint: str, headers: dict = {}, *args, **kwargs) -> requests.Response:
-        return TEFASRequester._request("GET", url_endpoint, headers=headers, *args, **kwargs)
+        return TEFASRequester._cached_request(
+            "GET", url_endpoint, None,
+            lambda: TEFASRequester._request("GET", url_endpoint, headers=headers, *args, **kwargs),
+        )
 
     @staticmethod
     def post_request(url_endpoint: str, headers: dict = {}, data: dict = {}, *args, **kwargs) -> requests.Response:
         encoded_str = urllib.parse.urlencode(data)
         encoded_bytes = encoded_str.encode('utf-8')
         content_length = len(encoded_bytes)
-        headers.update({"Content-Length": str(content_length)})
-        return TEFASRequester._request("POST", url_endpoint, headers=headers, data=data, *args, **kwargs)
+        headers = {**headers, "Content-Length": str(content_length)}
+        return TEFASRequester._cached_request(
+            "POST", url_endpoint, data,
+            lambda: TEFASRequester._request("POST", url_endpoint, headers=headers, data=data, *args, **kwargs),
+        )
 
     @staticmethod
     def postback_request(url_endpoint: str, headers: dict = {}, form_data: dict = {}, *args, **kwargs) -> requests.Response:
-        with requests.Session() as session:
-            session.headers.update({**TEFASRequester.BASE_HEADERS, **headers})
+        return TEFASRequester._cached_request(
+            "POSTBACK", url_endpoint, form_data,
+            lambda: TEFASRequester._postback_request(url_endpoint, headers=headers, form_data=form_data, *args, **kwargs),
+        )
 
+    @staticmethod
+    def _postback_request(url_endpoint: str, headers: dict = {}, form_data: dict = {}, *args, **kwargs) -> requests.Response:
+        with TEFASRequester.session_pool.session() as session:
             response = TEFASRequester._request_with_session(
-                session, "GET", url_endpoint, *args, **kwargs,
+                session, "GET", url_endpoint, headers=headers, *args, **kwargs,
             )
-            soup = TEFASRequester.get_soup(response)
+            data = TEFASRequester.get_postback_form_data(response.text)
+            form_data = {**data, **form_data}
+            return TEFASRequester._request_with_session(
+                session, "POST", url_endpoint, headers=headers, data=form_data, *args, **kwargs,
+            )
+
+    @staticmethod
+    def get_postback_form_data(html: str) -> dict:
+        return PostbackState.scan_form_data(html)
 
-            # Postback form data
-            data = {}
+    @staticmethod
+    def _cached_request(
+        method: str,
+        url_endpoint: str,
+        data: Optional[dict],
+        send: Callable[[], requests.Response],
+    ) -> requests.Response:
+        cache = TEFASRequester.response_cache
+        if cache is None or not cache.is_cacheable(url_endpoint):
+            return send()
 
-            # Find all <input> tags and extract their name and value
-            for input_tag in soup.find_all('input'):
-                name = input_tag.get('name')
-                if name:
-                    data[name] = input_tag.get('value', '')
+        cached = cache.get(method, url_endpoint, data, base_url=TEFASRequester.BASE_URL)
+        if cached is not None:
+            content, encoding = cached
+            return TEFASRequester._create_response(url_endpoint, content, encoding)
 
-            # Find <select> tags if any exist
-            for select_tag in soup.find_all('select'):
-                name = select_tag.get('name')
-                selected_option = select_tag.find('option', selected=True)
-                if name and selected_option:
-                    data[name] = selected_option.get('value', '')
+        response = send()
+        cache.put(method, url_endpoint, data, response.content, response.encoding, base_url=TEFASRequester.BASE_URL)
+        return response
 
-            form_data = {**data, **form_data}
-            return TEFASRequester._request_with_session(
-                session, "POST", url_endpoint, data=form_data, *args, **kwargs,
-            )
+    @staticmethod
+    def _create_response(url_endpoint: str, content: bytes, encoding: Optional[str]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = f"{TEFASRequester.BASE_URL}/{url_endpoint}"
+        response.encoding = encoding
+        response._content = content
+        return response
 
     @staticmethod
     def _request(method: str, url_endpoint: str, headers: dict = {}, data: Optional[dict] = None, *args, **kwargs) -> requests.Response:
-        with requests.Session() as session:
-            session.headers.update({**TEFASRequester.BASE_HEADERS, **headers})
+        with TEFASRequester.session_pool.session() as session:
             return TEFASRequester._request_with_session(
                 session, method, url_endpoint, headers=headers, data=data, *args, **kwargs,
             )
@@ -99,12 +214,36 @@ class TEFASRequester:
         url = f"{TEFASRequester.BASE_URL}/{url_endpoint}"
 
         for attempt in range(TEFASRequester.RETRIES):
+            TEFASRequester.rate_limiter.wait(url_endpoint)
+            retry_after = None
+
             try:
-                response = session.request(method, url, data=data, *args, **kwargs)
-                response.raise_for_status()
+                with TEFASRequester.concurrency_controller.slot() as slot:
+                    started_at = time.perf_counter()
+                    try:
+                        response = session.request(method, url, data=data, *args, **kwargs)
+                    except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                        Profiler.get_default().record_latency(url_endpoint, time.perf_counter() - started_at)
+                        slot.congest()
+                        raise
+                    Profiler.get_default().record_latency(
+                        url_endpoint, time.perf_counter() - started_at, response.status_code,
+                    )
+
+                    if TEFASRequester.is_congested(response.status_code):
+                        slot.congest()
+                        retry_after = response.headers.get("Retry-After", None)
+                    response.raise_for_status()
+                    slot.succeed()
+
+                if TEFASRequester.fixture_store is not None:
+                    TEFASRequester.fixture_store.record(
+                        method, url_endpoint, data,
+                        response.status_code, response.headers.get("Content-Type", None), response.content,
+                    )
                 return response
-            except (requests.exceptions.RequestException, requests.exceptions.ConnectionError) as e:
+            except requests.exceptions.RequestException as e:
                 if attempt < TEFASRequester.RETRIES - 1:
-                    time.sleep(TEFASRequester.DELAY * (attempt + 1))
+                    time.sleep(TEFASRequester.get_backoff_delay(attempt, retry_after))
                 else:
                     raise e
@@ -17,11 +17,14 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
-from datetime import date
-from typing import Dict, List
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Dict, List, Optional
 
 from .tefas_requester import TEFASRequester
-from data_struct import DateRange, Price
+from data_struct import DateRange, PriceSeries, TradingCalendar
 from utils import DateUtils
 
 
@@ -32,32 +35,113 @@ class UpdatedPricesFetcher:
         "bastarih": "{start_date}",
         "bittarih": "{end_date}",
     }
+    WINDOW_DAYS = 30
+    # TARIH is given in epoch milliseconds of the day's midnight in Turkey (UTC+3)
+    TIMESTAMP_OFFSET_MS = 3 * 60 * 60 * 1000
+    DAY_MS = 24 * 60 * 60 * 1000
 
 
     @staticmethod
-    def fetch_updated_prices(date_range: DateRange) -> Dict[str, List[Price]]:
-        data = {}
+    def fetch_updated_prices(
+        date_range: DateRange,
+        window_days: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        calendar: Optional[TradingCalendar] = None,
+    ) -> Dict[str, PriceSeries]:
+        windows = UpdatedPricesFetcher.split_date_range(
+            date_range, window_days or UpdatedPricesFetcher.WINDOW_DAYS, calendar or TradingCalendar.get_default(),
+        )
+        if not windows:
+            return {}
 
-        for fetch_date in date_range.get_all_dates():
-            payload = UpdatedPricesFetcher._format_payload(fetch_date, fetch_date)
-            response = TEFASRequester.post_request(UpdatedPricesFetcher.URL_ENDPOINT, data=payload)
-            response_data = response.json().get("data", [])
+        max_workers = max_workers or TEFASRequester.session_pool.get_pool_size()
 
-            for item in response_data:
-                fund_code = item.get("FONKODU", None)
-                price_str = item.get("FIYAT", "0.0")
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(windows))) as executor:
+            results = list(executor.map(UpdatedPricesFetcher._fetch_window, windows))
 
-                price_float = float(price_str)
-                if price_float == 0.0:
-                    continue
+        return UpdatedPricesFetcher._merge_results([item for items in results for item in items])
 
-                price = Price(
-                    date=fetch_date,
-                    value=price_float
-                )
-                data.setdefault(fund_code, []).append(price)
+    @staticmethod
+    def split_date_range(
+        date_range: DateRange,
+        window_days: int,
+        calendar: Optional[TradingCalendar] = None,
+    ) -> List[DateRange]:
+        if window_days <= 0:
+            raise ValueError("Window size must be a positive number of days.")
+
+        windows = []
+        start_date = date_range.get_start_date()
+        while start_date <= date_range.get_end_date():
+            end_date = min(start_date + timedelta(days=window_days - 1), date_range.get_end_date())
+            windows.append(DateRange(start_date=start_date, end_date=end_date))
+            start_date = end_date + timedelta(days=1)
+
+        if calendar is None:
+            return windows
+
+        # No prices are published on weekends and holidays, windows are narrowed
+        # down to their trading days and the ones without any are not requested.
+        windows = [calendar.trim(window) for window in windows]
+        return [window for window in windows if window is not None]
+
+    @staticmethod
+    def _fetch_window(window: DateRange) -> List[dict]:
+        payload = UpdatedPricesFetcher._format_payload(window.get_start_date(), window.get_end_date())
+        response = TEFASRequester.post_request(UpdatedPricesFetcher.URL_ENDPOINT, data=payload)
+        response_json = response.json()
+        response_data = response_json.get("data", [])
+
+        # The server caps the number of records per response,
+        # truncated windows are fetched again in two halves.
+        records_total = int(response_json.get("recordsTotal", len(response_data)))
+        if records_total <= len(response_data):
+            return response_data
+
+        days = (window.get_end_date() - window.get_start_date()).days + 1
+        if days == 1:
+            logging.warning(
+                f"Price history for {DateUtils.format_date(window.get_start_date())} is truncated: "
+                f"{len(response_data)} of {records_total} records"
+            )
+            return response_data
+
+        return [
+            item
+            for half in UpdatedPricesFetcher.split_date_range(window, (days + 1) // 2)
+            for item in UpdatedPricesFetcher._fetch_window(half)
+        ]
 
-        return data
+    @staticmethod
+    def _merge_results(items: List[dict]) -> Dict[str, PriceSeries]:
+        items = [item for item in items if float(item.get("FIYAT", "0.0")) != 0.0]
+        if not items:
+            return {}
+
+        codes = np.array([item.get("FONKODU", None) or "" for item in items])
+        values = np.array([float(item.get("FIYAT", "0.0")) for item in items])
+        timestamps = np.array([int(item.get("TARIH", 0)) for item in items], dtype=np.int64)
+        dates = ((timestamps + UpdatedPricesFetcher.TIMESTAMP_OFFSET_MS) // UpdatedPricesFetcher.DAY_MS).astype(
+            PriceSeries.DATE_DTYPE
+        )
+
+        # Group by fund, each group sorted by date
+        order = np.lexsort((dates, codes))
+        codes, dates, values = codes[order], dates[order], values[order]
+
+        # Overlapping windows repeat prices, the sort is stable
+        # so the last one fetched for a date is kept.
+        last = np.append((codes[1:] != codes[:-1]) | (dates[1:] != dates[:-1]), True)
+        codes, dates, values = codes[last], dates[last], values[last]
+        boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        starts = np.concatenate([[0], boundaries]).tolist()
+        stops = np.concatenate([boundaries, [len(codes)]]).tolist()
+
+        return {
+            str(codes[start]): PriceSeries(dates=dates[start:stop], values=values[start:stop])
+            for start, stop in zip(starts, stops)
+            if codes[start]
+        }
 
     @staticmethod
     def _format_payload(start_date: date, end_date: date) -> dict:
@@ -17,8 +17,10 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+from .array_utils import ArrayUtils
 from .dataframe_utils import DataFrameUtils
 from .date_utils import DateUtils
+from .profiler import Profiler
 
 
-__all__ = ["DataFrameUtils", "DateUtils"]
+__all__ = ["ArrayUtils", "DataFrameUtils", "DateUtils", "Profiler"]
@@ -0,0 +1,81 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import ast
+import numpy as np
+import re
+from typing import List, Tuple
+
+from .date_utils import DateUtils
+
+
+class ArrayUtils:
+    DATE_PATTERN = re.compile(r"\d{2}\.\d{2}\.\d{4}")
+    PRICE_VALUE_PATTERN = re.compile(r"['\"]value['\"]:\s*([^,}\s]+)")
+    DISTRIBUTION_PATTERN = re.compile(
+        r"\{['\"]name['\"]:\s*(['\"])(.*?)\1,\s*['\"]amount['\"]:\s*([^,}\s]+)\s*\}"
+    )
+
+    @staticmethod
+    def decode_float_array(string: str) -> np.ndarray:
+        inner = string.strip().removeprefix("[").removesuffix("]").strip()
+        if not inner:
+            return np.empty(0, dtype=np.float64)
+
+        try:
+            return np.array(inner.split(","), dtype=np.float64)
+        except ValueError:
+            raise ValueError(f"Array contains non-numeric values: {string[:50]}")
+
+    @staticmethod
+    def decode_date_array(string: str) -> np.ndarray:
+        dates = ArrayUtils.DATE_PATTERN.findall(string)
+
+        # Every entry must be a date, skipping one would shift all later ones
+        inner = string.strip().removeprefix("[").removesuffix("]").strip()
+        if len(dates) != (inner.count(",") + 1 if inner else 0):
+            raise ValueError(f"Array contains malformed dates: {string[:50]}")
+        return DateUtils.parse_dates(dates)
+
+    @staticmethod
+    def decode_price_records(string: str) -> Tuple[np.ndarray, np.ndarray]:
+        # "[{'date': 'dd.mm.yyyy', 'value': 1.23}, ...]" into date and value arrays
+        dates = DateUtils.parse_dates(ArrayUtils.DATE_PATTERN.findall(string))
+        try:
+            values = np.array(ArrayUtils.PRICE_VALUE_PATTERN.findall(string), dtype=np.float64)
+        except ValueError:
+            raise ValueError(f"Price records contain non-numeric values: {string[:50]}")
+
+        if len(dates) != len(values):
+            raise ValueError(f"Price records are malformed: {string[:50]}")
+        return dates, values
+
+    @staticmethod
+    def decode_distribution_records(string: str) -> List[dict]:
+        # "[{'name': '...', 'amount': 0.12}, ...]", escaped names take the slow path
+        if "\\" in string:
+            return ast.literal_eval(string)
+
+        records = [
+            {"name": name, "amount": float(amount)}
+            for _, name, amount in ArrayUtils.DISTRIBUTION_PATTERN.findall(string)
+        ]
+        if len(records) != string.count("{"):
+            return ast.literal_eval(string)
+        return records
@@ -18,6 +18,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 
 import ast
+import numpy as np
 import pandas as pd
 
 
@@ -32,7 +33,7 @@ class DataFrameUtils:
         df = df.apply(
             lambda col: col.astype('Int64')
             if pd.api.types.is_float_dtype(col) and \
-                col.dropna().apply(float.is_integer).all()
+                DataFrameUtils._is_integer_column(col)
             else col
         )
 
@@ -46,6 +47,11 @@ class DataFrameUtils:
 
         return df
 
+    @staticmethod
+    def _is_integer_column(col: pd.Series) -> bool:
+        values = col.dropna().to_numpy(dtype=np.float64)
+        return bool(np.all(np.isfinite(values) & (np.mod(values, 1) == 0)))
+
     @staticmethod
     def _parse_to_literal(x):
         try:
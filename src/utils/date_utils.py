@@ -17,11 +17,14 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+import numpy as np
 from datetime import datetime, date
+from typing import List, Sequence
 
 
 class DateUtils:
     DATE_FORMAT = "%d.%m.%Y"
+    DATE_LENGTH = 10
 
     @staticmethod
     def parse_date(date_str: str) -> date:
@@ -34,3 +37,41 @@ class DateUtils:
     @staticmethod
     def get_today() -> date:
         return date.today()
+
+    @staticmethod
+    def parse_dates(date_strs: Sequence[str]) -> np.ndarray:
+        # Vectorized "dd.mm.yyyy" parsing into a datetime64[D] array,
+        # done on the code points of a fixed-width unicode array.
+        strs = np.asarray(date_strs, dtype=f"U{DateUtils.DATE_LENGTH}")
+        if strs.size == 0:
+            return np.empty(0, dtype="datetime64[D]")
+
+        chars = strs.reshape(-1).view(np.uint32).reshape(-1, DateUtils.DATE_LENGTH).astype(np.int64) - ord("0")
+        digits = chars[:, [0, 1, 3, 4, 6, 7, 8, 9]]
+        separators = chars[:, [2, 5]]
+        if np.any((digits < 0) | (digits > 9)) or np.any(separators != ord(".") - ord("0")):
+            raise ValueError(f"Dates must be in '{DateUtils.DATE_FORMAT}' format.")
+
+        day = digits[:, 0] * 10 + digits[:, 1]
+        month = digits[:, 2] * 10 + digits[:, 3]
+        year = digits[:, 4] * 1000 + digits[:, 5] * 100 + digits[:, 6] * 10 + digits[:, 7]
+        if np.any((month < 1) | (month > 12)) or np.any(day < 1):
+            raise ValueError("Dates contain an invalid day or month.")
+
+        months = ((year - 1970) * 12 + (month - 1)).astype("datetime64[M]")
+        dates = months.astype("datetime64[D]") + (day - 1)
+        if np.any(dates.astype("datetime64[M]") != months):
+            raise ValueError("Dates contain an invalid day or month.")
+
+        return dates
+
+    @staticmethod
+    def format_dates(dates: np.ndarray) -> List[str]:
+        if len(dates) == 0:
+            return []
+
+        # "yyyy-mm-dd" code points reordered into "dd.mm.yyyy"
+        iso = np.datetime_as_string(np.asarray(dates, dtype="datetime64[D]"), unit="D").astype(f"U{DateUtils.DATE_LENGTH}")
+        chars = iso.view(np.uint32).reshape(-1, DateUtils.DATE_LENGTH)[:, [8, 9, 4, 5, 6, 4, 0, 1, 2, 3]].copy()
+        chars[:, [2, 5]] = ord(".")
+        return chars.view(f"U{DateUtils.DATE_LENGTH}").reshape(-1).tolist()
@@ -0,0 +1,244 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import bisect
+import cProfile
+import json
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class Profiler:
+    # Upper bounds of the latency histogram buckets in seconds, the last bucket is unbounded
+    LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+    default_profiler: Optional["Profiler"] = None
+
+
+    def __init__(self, enabled: bool = False, trace_memory: bool = False, cprofile: bool = False):
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self.cprofile = cprofile and enabled
+
+        self.lock = threading.Lock()
+        self.started_at = time.perf_counter()
+        self.stages: List[dict] = []
+        self.timers: Dict[str, dict] = {}
+        self.latencies: Dict[str, dict] = {}
+        self.profile: Optional[cProfile.Profile] = None
+
+    @classmethod
+    def get_default(cls) -> "Profiler":
+        # Disabled unless set, so the hooks in the fetchers cost a single attribute check
+        if cls.default_profiler is None:
+            cls.default_profiler = cls()
+        return cls.default_profiler
+
+    @classmethod
+    def set_default(cls, profiler: "Profiler") -> None:
+        cls.default_profiler = profiler
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        self.started_at = time.perf_counter()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.cprofile:
+            # cProfile follows the calling thread only, the fetching threads are not included
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop(self) -> None:
+        if not self.enabled:
+            return
+        if self.profile is not None:
+            self.profile.disable()
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return nullcontext()
+        return self._stage(name)
+
+    def timer(self, name: str):
+        # Sums up a step that runs many times, possibly in several threads at once
+        if not self.enabled:
+            return nullcontext()
+        return self._timer(name)
+
+    def record_latency(self, endpoint: str, seconds: float, status: Optional[int] = None) -> None:
+        if not self.enabled:
+            return
+
+        # Query strings carry fund codes, the endpoint is the page itself
+        endpoint = endpoint.split("?", 1)[0]
+        with self.lock:
+            latency = self.latencies.get(endpoint, None)
+            if latency is None:
+                latency = self.latencies[endpoint] = {
+                    "count": 0,
+                    "errors": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "buckets": [0] * (len(Profiler.LATENCY_BUCKETS) + 1),
+                }
+            latency["count"] += 1
+            if status is None or status >= 400:
+                latency["errors"] += 1
+            latency["total_seconds"] += seconds
+            latency["max_seconds"] = max(latency["max_seconds"], seconds)
+            latency["buckets"][bisect.bisect_left(Profiler.LATENCY_BUCKETS, seconds)] += 1
+
+    def get_report(self) -> dict:
+        with self.lock:
+            latencies = {
+                endpoint: {
+                    "count": latency["count"],
+                    "errors": latency["errors"],
+                    "mean_seconds": round(latency["total_seconds"] / latency["count"], 6),
+                    "p50_seconds": Profiler._get_percentile(latency["buckets"], 0.5),
+                    "p95_seconds": Profiler._get_percentile(latency["buckets"], 0.95),
+                    "max_seconds": round(latency["max_seconds"], 6),
+                    "histogram": {
+                        Profiler._get_bucket_label(i): count
+                        for i, count in enumerate(latency["buckets"]) if count
+                    },
+                }
+                for endpoint, latency in self.latencies.items()
+            }
+            return {
+                "wall_seconds": round(time.perf_counter() - self.started_at, 6),
+                "peak_rss_mb": Profiler.get_peak_rss_mb(),
+                "stages": [dict(stage) for stage in self.stages],
+                "timers": {name: dict(timer) for name, timer in self.timers.items()},
+                "latencies": latencies,
+            }
+
+    def log_summary(self) -> None:
+        if not self.enabled:
+            return
+
+        report = self.get_report()
+        logging.info(f"Profile: {report['wall_seconds']:.2f}s wall, peak RSS {report['peak_rss_mb'] or 0:.1f} MB")
+        for stage in report["stages"]:
+            traced = f", traced peak {stage['traced_peak_mb']:.1f} MB" if "traced_peak_mb" in stage else ""
+            logging.info(
+                f"  stage {stage['name']:<16} {stage['wall_seconds']:>9.3f}s wall {stage['cpu_seconds']:>9.3f}s CPU, "
+                f"peak RSS {stage['peak_rss_mb'] or 0:.1f} MB{traced}"
+            )
+        for name, timer in report["timers"].items():
+            logging.info(
+                f"  timer {name:<16} {timer['count']:>7} calls {timer['wall_seconds']:>9.3f}s wall "
+                f"{timer['cpu_seconds']:>9.3f}s CPU (summed over threads)"
+            )
+        for endpoint, latency in report["latencies"].items():
+            logging.info(
+                f"  endpoint {endpoint:<36} {latency['count']:>7} requests, {latency['errors']} errors, "
+                f"mean {latency['mean_seconds'] * 1000:.0f} ms, p50 {Profiler._format_bound(latency['p50_seconds'])}, "
+                f"p95 {Profiler._format_bound(latency['p95_seconds'])}, max {latency['max_seconds'] * 1000:.0f} ms"
+            )
+
+    def write_report(self, path: Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.get_report(), f, indent=2)
+
+    def dump_stats(self, path: Path) -> None:
+        if self.profile is not None:
+            self.profile.dump_stats(str(path))
+
+    @staticmethod
+    def get_peak_rss_mb() -> Optional[float]:
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return round(peak / divisor, 3)
+
+    @contextmanager
+    def _stage(self, name: str) -> Iterator[None]:
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall_started_at = time.perf_counter()
+        cpu_started_at = time.process_time()
+        try:
+            yield
+        finally:
+            stage = {
+                "name": name,
+                "wall_seconds": round(time.perf_counter() - wall_started_at, 6),
+                "cpu_seconds": round(time.process_time() - cpu_started_at, 6),
+                # High-water mark of the whole run so far, a rise shows the stage that caused it
+                "peak_rss_mb": Profiler.get_peak_rss_mb(),
+            }
+            if tracemalloc.is_tracing():
+                stage["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+            with self.lock:
+                self.stages.append(stage)
+
+    @contextmanager
+    def _timer(self, name: str) -> Iterator[None]:
+        wall_started_at = time.perf_counter()
+        cpu_started_at = time.thread_time()
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - wall_started_at
+            cpu_seconds = time.thread_time() - cpu_started_at
+            with self.lock:
+                timer = self.timers.setdefault(name, {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0})
+                timer["count"] += 1
+                timer["wall_seconds"] = round(timer["wall_seconds"] + wall_seconds, 6)
+                timer["cpu_seconds"] = round(timer["cpu_seconds"] + cpu_seconds, 6)
+
+    @staticmethod
+    def _get_percentile(buckets: List[int], percentile: float) -> Optional[float]:
+        # Upper bound of the bucket holding the percentile, None past the last bound
+        target = sum(buckets) * percentile
+        count = 0
+        for i, bucket_count in enumerate(buckets):
+            count += bucket_count
+            if count >= target:
+                return Profiler.LATENCY_BUCKETS[i] if i < len(Profiler.LATENCY_BUCKETS) else None
+        return None
+
+    @staticmethod
+    def _get_bucket_label(index: int) -> str:
+        if index < len(Profiler.LATENCY_BUCKETS):
+            return f"<={Profiler.LATENCY_BUCKETS[index]}"
+        return f">{Profiler.LATENCY_BUCKETS[-1]}"
+
+    @staticmethod
+    def _format_bound(seconds: Optional[float]) -> str:
+        if seconds is None:
+            return f"> {Profiler.LATENCY_BUCKETS[-1] * 1000:.0f} ms"
+        return f"<= {seconds * 1000:.0f} ms"
@@ -0,0 +1,146 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+import json
+from datetime import date
+
+import pytest
+
+from data_manager import CheckpointJournal
+from data_struct import Asset, AssetDistribution, Founder, Price
+
+
+OPTIONS = {CheckpointJournal.DATE: "15.07.2025", "range": "YEAR_1"}
+
+
+def make_asset(code: str, value: float = 1.0) -> Asset:
+    return Asset(
+        code=code,
+        name=f"{code} SENTETİK FON",
+        founder=Founder("PAA", "Sentetik Portföy Yönetimi A.Ş."),
+        category="Serbest Fon",
+        risk_score=3,
+        market_share=0.01,
+        is_in_tefas=True,
+        prices=[Price(date=date(2025, 7, 14), value=value), Price(date=date(2025, 7, 15), value=value * 2)],
+        asset_distributions=[AssetDistribution("Hisse Senedi", 100.0)],
+    )
+
+
+def run_line(options: dict = OPTIONS) -> str:
+    return json.dumps({"type": CheckpointJournal.RUN, "options": options}, ensure_ascii=False) + "\n"
+
+
+def asset_line(asset: Asset) -> str:
+    return json.dumps({"type": CheckpointJournal.ASSET, "asset": asset.to_dict()}, ensure_ascii=False) + "\n"
+
+
+def failure_line(code: str, error: str = "TimeoutError: timed out") -> str:
+    return json.dumps({"type": CheckpointJournal.FAILURE, "code": code, "error": error}) + "\n"
+
+
+def write_journal(path, *lines: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def test_resume_loads_assets_and_failures(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    write_journal(path, run_line(), asset_line(make_asset("AAA")), failure_line("BBB"))
+
+    with CheckpointJournal(path, OPTIONS, resume=True) as journal:
+        assert [asset.get_code() for asset in journal.get_assets()] == ["AAA"]
+        assert journal.get_assets()[0].to_dict() == make_asset("AAA").to_dict()
+        assert journal.get_failures() == {"BBB": "TimeoutError: timed out"}
+
+
+def test_failure_completed_by_later_asset(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    write_journal(path, run_line(), failure_line("AAA"), failure_line("BBB"), asset_line(make_asset("AAA")))
+
+    with CheckpointJournal(path, OPTIONS, resume=True) as journal:
+        assert [asset.get_code() for asset in journal.get_assets()] == ["AAA"]
+        assert journal.get_failures() == {"BBB": "TimeoutError: timed out"}
+
+
+def test_truncated_last_record_is_dropped(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    complete = run_line() + asset_line(make_asset("AAA"))
+    write_journal(path, complete, asset_line(make_asset("BBB"))[:40])
+
+    with CheckpointJournal(path, OPTIONS, resume=True) as journal:
+        assert [asset.get_code() for asset in journal.get_assets()] == ["AAA"]
+        assert path.stat().st_size == len(complete.encode("utf-8"))
+
+
+def test_records_after_truncation_are_resumed(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    write_journal(path, run_line(), asset_line(make_asset("AAA")), asset_line(make_asset("BBB"))[:40])
+
+    with CheckpointJournal(path, OPTIONS, resume=True) as journal:
+        journal.record_asset(make_asset("BBB", 3.0))
+        journal.record_failure("CCC", TimeoutError("timed out"))
+
+    with CheckpointJournal(path, OPTIONS, resume=True) as journal:
+        assets = {asset.get_code(): asset for asset in journal.get_assets()}
+        assert sorted(assets) == ["AAA", "BBB"]
+        assert assets["BBB"].to_dict() == make_asset("BBB", 3.0).to_dict()
+        assert journal.get_failures() == {"CCC": "TimeoutError: timed out"}
+
+
+def test_corrupt_middle_record_is_refused(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    write_journal(path, run_line(), "{\"type\": \"asset\", \"asset\"\n", asset_line(make_asset("AAA")))
+    size = path.stat().st_size
+
+    with pytest.raises(ValueError, match="corrupt at line 2"):
+        CheckpointJournal(path, OPTIONS, resume=True)
+    assert path.stat().st_size == size
+
+
+def test_journal_of_another_day_is_refused(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    write_journal(path, run_line({**OPTIONS, CheckpointJournal.DATE: "14.07.2025"}), asset_line(make_asset("AAA")))
+
+    with pytest.raises(ValueError, match="was written on 14.07.2025"):
+        CheckpointJournal(path, OPTIONS, resume=True)
+
+
+def test_journal_with_other_options_is_refused(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    write_journal(path, run_line({**OPTIONS, "range": "YEAR_5"}), asset_line(make_asset("AAA")))
+
+    with pytest.raises(ValueError, match="different options"):
+        CheckpointJournal(path, OPTIONS, resume=True)
+
+
+def test_missing_journal_is_refused(tmp_path):
+    with pytest.raises(ValueError, match="nothing to resume"):
+        CheckpointJournal(tmp_path / "checkpoint.jsonl", OPTIONS, resume=True)
+
+
+def test_new_journal_replaces_old_one(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    write_journal(path, run_line(), asset_line(make_asset("AAA")))
+
+    with CheckpointJournal(path, OPTIONS) as journal:
+        assert journal.get_assets() == []
+
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == run_line()
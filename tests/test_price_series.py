@@ -0,0 +1,144 @@
+"""
+tefas-data-exporter - Export raw data from TEFAS website.
+Copyright (C) 2025  Fevzi Babaoğlu
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+from datetime import date
+
+import numpy as np
+
+from data_struct import Asset, AssetDistribution, Founder, Price, PriceSeries
+
+
+def make_series(prices: dict) -> PriceSeries:
+    return PriceSeries.from_prices([Price(date=d, value=v) for d, v in sorted(prices.items())])
+
+
+def to_dict(series: PriceSeries) -> dict:
+    return {price.get_date(): price.get_value() for price in series}
+
+
+def test_upsert_overwrites_existing_date():
+    series = make_series({date(2025, 7, 1): 1.0, date(2025, 7, 2): 2.0})
+
+    result = series.upsert(make_series({date(2025, 7, 2): 5.0}))
+
+    assert to_dict(result) == {date(2025, 7, 1): 1.0, date(2025, 7, 2): 5.0}
+
+
+def test_upsert_inserts_before_between_and_after():
+    series = make_series({date(2025, 7, 2): 2.0, date(2025, 7, 4): 4.0})
+
+    result = series.upsert(make_series({
+        date(2025, 7, 1): 1.0,
+        date(2025, 7, 3): 3.0,
+        date(2025, 7, 5): 5.0,
+    }))
+
+    assert to_dict(result) == {
+        date(2025, 7, 1): 1.0,
+        date(2025, 7, 2): 2.0,
+        date(2025, 7, 3): 3.0,
+        date(2025, 7, 4): 4.0,
+        date(2025, 7, 5): 5.0,
+    }
+    assert list(result.get_dates()) == sorted(result.get_dates())
+
+
+def test_upsert_all_keeps_series_apart():
+    # Dates past the end of one series must not leak into the next one
+    first = make_series({date(2025, 7, 1): 1.0, date(2025, 7, 3): 3.0})
+    second = make_series({date(2025, 7, 2): 20.0})
+    third = make_series({date(2025, 7, 1): 100.0})
+
+    results = PriceSeries.upsert_all(
+        [first, second, third],
+        [
+            make_series({date(2025, 7, 4): 4.0}),
+            make_series({date(2025, 7, 1): 10.0, date(2025, 7, 2): 25.0, date(2025, 7, 5): 50.0}),
+            make_series({date(2025, 7, 3): 300.0}),
+        ],
+    )
+
+    assert [to_dict(result) for result in results] == [
+        {date(2025, 7, 1): 1.0, date(2025, 7, 3): 3.0, date(2025, 7, 4): 4.0},
+        {date(2025, 7, 1): 10.0, date(2025, 7, 2): 25.0, date(2025, 7, 5): 50.0},
+        {date(2025, 7, 1): 100.0, date(2025, 7, 3): 300.0},
+    ]
+
+
+def test_upsert_all_skips_missing_updates():
+    first = make_series({date(2025, 7, 1): 1.0})
+    second = make_series({date(2025, 7, 1): 2.0})
+
+    results = PriceSeries.upsert_all([first, second], [None, make_series({date(2025, 7, 2): 3.0})])
+
+    assert to_dict(results[0]) == {date(2025, 7, 1): 1.0}
+    assert to_dict(results[1]) == {date(2025, 7, 1): 2.0, date(2025, 7, 2): 3.0}
+
+
+def test_upsert_all_without_updates_returns_series():
+    first = make_series({date(2025, 7, 1): 1.0})
+
+    assert PriceSeries.upsert_all([first], [None]) == [first]
+    assert PriceSeries.upsert_all([first], [make_series({})]) == [first]
+
+
+def test_upsert_all_does_not_mutate_inputs():
+    series = make_series({date(2025, 7, 1): 1.0, date(2025, 7, 3): 3.0})
+    update = make_series({date(2025, 7, 1): 10.0, date(2025, 7, 2): 2.0})
+    dates, values = series.get_dates().copy(), series.get_values().copy()
+    update_dates, update_values = update.get_dates().copy(), update.get_values().copy()
+
+    PriceSeries.upsert_all([series], [update])
+
+    np.testing.assert_array_equal(series.get_dates(), dates)
+    np.testing.assert_array_equal(series.get_values(), values)
+    np.testing.assert_array_equal(update.get_dates(), update_dates)
+    np.testing.assert_array_equal(update.get_values(), update_values)
+
+
+def test_upsert_all_accepts_read_only_arrays():
+    series = make_series({date(2025, 7, 1): 1.0})
+    series.get_values().flags.writeable = False
+
+    result = series.upsert(make_series({date(2025, 7, 1): 2.0}))
+
+    assert to_dict(result) == {date(2025, 7, 1): 2.0}
+    assert to_dict(series) == {date(2025, 7, 1): 1.0}
+
+
+def test_extend_prices_updates_date_range():
+    asset = Asset(
+        code="AAA",
+        name="SENTETİK FON",
+        founder=Founder("PAA", "Sentetik Portföy Yönetimi A.Ş."),
+        category="Serbest Fon",
+        risk_score=3,
+        market_share=0.01,
+        is_in_tefas=True,
+        prices=[Price(date=date(2025, 7, 2), value=2.0)],
+        asset_distributions=[AssetDistribution("Hisse Senedi", 100.0)],
+    )
+    new_prices = [Price(date=date(2025, 7, 1), value=1.0), Price(date=date(2025, 7, 2), value=2.5)]
+
+    asset.extend_prices(new_prices)
+
+    assert to_dict(asset.get_prices()) == {date(2025, 7, 1): 1.0, date(2025, 7, 2): 2.5}
+    assert asset.get_date_range().get_start_date() == date(2025, 7, 1)
+    assert asset.get_date_range().get_end_date() == date(2025, 7, 2)
+    assert [price.get_value() for price in new_prices] == [1.0, 2.5]